@@ -1,10 +1,33 @@
+import asyncio
+import hashlib
+
+from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers import device_registry as dr
-from .const import DOMAIN
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+from .const import (
+    DOMAIN,
+    CONF_UPDATE_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MAX_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    CONF_POLL_RATE_LIMIT,
+    CONF_COMMAND_RATE_LIMIT,
+    CONF_MAX_PARALLEL_READS,
+    STORAGE_VERSION,
+    TOKEN_STORAGE_KEY,
+)
 import logging
 from .api import MarsHydroAPI
+from .rate_limit import DEFAULT_COMMAND_RATE, DEFAULT_POLL_RATE, RateLimiter
+from .scheduler import DEFAULT_READ_LIMIT
+from .coordinator import MarsHydroDataUpdateCoordinator
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,58 +37,57 @@ PLATFORMS = ["sensor", "light", "switch", "fan"]  # Sensor hinzugefügt
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Setup für die Mars Hydro-Integration."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Mars Hydro integration from a config entry."""
-    email = entry.data["email"]
-    password = entry.data["password"]
-
-    api = MarsHydroAPI(email, password)
-    await api.login()
-
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {"api": api}
+    client = await _async_acquire_client(hass, entry)
+    coordinator = client["coordinator"]
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "api": client["api"],
+        "coordinator": coordinator,
+        "account": _account_key(entry),
+    }
 
     # Gerät registrieren
     device_registry = dr.async_get(hass)
 
-    # Light-Gerät registrieren
-    light_data = await api.get_lightdata()
-    if light_data:
+    # Light-Geräte registrieren
+    for light_data in coordinator.data["LIGHT"].values():
         device_registry.async_get_or_create(
             config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, light_data["id"])},
+            identifiers={(DOMAIN, light_data.device_id)},
             manufacturer="Mars Hydro",
-            name=light_data["deviceName"],
+            name=light_data.name,
             model="Mars Hydro Light",
         )
-        _LOGGER.info(
-            f"Light Device {light_data['deviceName']} wurde erfolgreich registriert."
-        )
-    else:
+        _LOGGER.info(f"Light Device {light_data.name} wurde erfolgreich registriert.")
+    if not coordinator.data["LIGHT"]:
         _LOGGER.warning("Kein Light-Gerät gefunden, Registrierung übersprungen.")
 
-    # Fan-Gerät registrieren
-    fan_data = await api.get_fandata()
-    if fan_data:
+    # Fan-Geräte registrieren
+    for fan_data in coordinator.data["WIND"].values():
         device_registry.async_get_or_create(
             config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, fan_data["id"])},
+            identifiers={(DOMAIN, fan_data.device_id)},
             manufacturer="Mars Hydro",
-            name=fan_data["deviceName"],
+            name=fan_data.name,
             model="Mars Hydro Fan",
         )
-        _LOGGER.info(
-            f"Fan Device {fan_data['deviceName']} wurde erfolgreich registriert."
-        )
-    else:
+        _LOGGER.info(f"Fan Device {fan_data.name} wurde erfolgreich registriert.")
+    if not coordinator.data["WIND"]:
         _LOGGER.warning("Kein Fan-Gerät gefunden, Registrierung übersprungen.")
 
     # Plattformen laden
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Bei geänderten Optionen neu laden, damit das Intervall übernommen wird
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
@@ -76,11 +98,173 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_client(hass, entry_data["account"], entry.entry_id)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Lösche den gespeicherten Token, wenn die Instanz entfernt wird."""
+    # Der Token gehört dem Konto; nur löschen, wenn keine Instanz ihn mehr nutzt
+    account = _account_key(entry)
+    if not any(
+        _account_key(other) == account
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        await _token_store(hass, account).async_remove()
+
+
+def _account_key(entry: ConfigEntry) -> str:
+    """Schlüssel des Kontos; Instanzen mit derselben E-Mail teilen einen Client."""
+    return entry.data["email"].strip().lower()
+
+
+async def _async_acquire_client(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Gib den gemeinsamen Client des Kontos zurück und erstelle ihn bei Bedarf.
+
+    Die Cloud erlaubt nur eine angemeldete Sitzung pro Konto. Alle Instanzen
+    desselben Kontos teilen sich daher API, Coordinator, Rate-Limiter und
+    Caches; jede Instanz wird in ``entries`` gezählt.
+    """
+    clients = hass.data[DOMAIN].setdefault("clients", {})
+    account = _account_key(entry)
+    # Gleichzeitig ladende Instanzen desselben Kontos warten auf den ersten Client
+    lock = (
+        hass.data[DOMAIN]
+        .setdefault("client_locks", {})
+        .setdefault(account, asyncio.Lock())
+    )
+    async with lock:
+        client = clients.get(account)
+        if client is None:
+            client = await _async_create_client(hass, entry)
+            clients[account] = client
+        else:
+            # Die zuletzt geladene Instanz bestimmt die Optionen des Kontos
+            _configure_client(client, entry.options)
+        client["entries"].add(entry.entry_id)
+        return client
+
+
+def _configure_client(client: dict, options) -> None:
+    """Übernimm Polling-, Rate-Limit- und Parallelitätsoptionen eines Clients."""
+    client["api"].rate_limiter.configure(
+        options.get(CONF_POLL_RATE_LIMIT, DEFAULT_POLL_RATE),
+        options.get(CONF_COMMAND_RATE_LIMIT, DEFAULT_COMMAND_RATE),
+    )
+    client["api"].scheduler.configure(
+        options.get(CONF_MAX_PARALLEL_READS, DEFAULT_READ_LIMIT)
+    )
+    client["coordinator"].configure(
+        options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+        options.get(CONF_ADAPTIVE_POLLING, True),
+        options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+    )
+
+
+async def _async_create_client(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Erstelle API und Coordinator eines Kontos und melde dich an."""
+    account = _account_key(entry)
+    options = entry.options
+    update_interval = options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+    adaptive = options.get(CONF_ADAPTIVE_POLLING, True)
+    max_update_interval = options.get(
+        CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+    )
+    poll_rate = options.get(CONF_POLL_RATE_LIMIT, DEFAULT_POLL_RATE)
+    command_rate = options.get(CONF_COMMAND_RATE_LIMIT, DEFAULT_COMMAND_RATE)
+
+    # Eigene Sitzung auf dem Verbindungspool von Home Assistant; sie gehört
+    # dem Konto und wird beim Freigeben des Clients abgelöst
+    session = async_create_clientsession(hass, auto_cleanup=False)
+    api = MarsHydroAPI(
+        entry.data["email"],
+        entry.data["password"],
+        session,
+        rate_limiter=RateLimiter(poll_rate, command_rate),
+    )
+    api.scheduler.configure(options.get(CONF_MAX_PARALLEL_READS, DEFAULT_READ_LIMIT))
+
+    # Der Coordinator gehört dem Konto, nicht der gerade ladenden Instanz;
+    # sonst würde er beim Entladen dieser Instanz für alle anderen gestoppt
+    context_token = config_entries.current_entry.set(None)
+    try:
+        coordinator = MarsHydroDataUpdateCoordinator(
+            hass,
+            api,
+            update_interval=update_interval,
+            adaptive=adaptive,
+            max_update_interval=max_update_interval,
+        )
+    finally:
+        config_entries.current_entry.reset(context_token)
+
+    # Gespeicherten Token wiederverwenden; er wird bei der ersten Anfrage geprüft
+    store = _token_store(hass, account)
+    stored = await store.async_load()
+    if stored:
+        api.restore_token(stored["token"], stored["last_login_time"])
+
+    def _save_token(token, last_login_time):
+        store.async_delay_save(
+            lambda: {"token": token, "last_login_time": last_login_time}
+        )
+
+    api.on_token_refreshed = _save_token
+
+    try:
+        if not api.token:
+            await api.login()
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            raise ConfigEntryNotReady from coordinator.last_exception
+    except Exception:
+        # Client und Sitzung nicht offen lassen, wenn das Setup fehlschlägt
+        await coordinator.async_shutdown()
+        await api.close()
+        session.detach()
+        raise
+
+    return {
+        "api": api,
+        "coordinator": coordinator,
+        "session": session,
+        "entries": set(),
+    }
+
+
+async def _async_release_client(
+    hass: HomeAssistant, account: str, entry_id: str
+) -> None:
+    """Gib den Client frei; die letzte Instanz des Kontos schließt ihn."""
+    clients = hass.data[DOMAIN]["clients"]
+    client = clients[account]
+    client["entries"].discard(entry_id)
+    if client["entries"]:
+        return
+    del clients[account]
+    # Eine gerade ladende Instanz hält den Lock noch und braucht ihn weiter
+    locks = hass.data[DOMAIN]["client_locks"]
+    if account in locks and not locks[account].locked():
+        del locks[account]
+    await client["coordinator"].async_shutdown()
+    await client["api"].close()
+    client["session"].detach()
+
+
+def _token_store(hass: HomeAssistant, account: str) -> Store:
+    """Speicher für Token und Login-Zeitpunkt eines Kontos."""
+    account_id = hashlib.sha256(account.encode()).hexdigest()[:16]
+    return Store(hass, STORAGE_VERSION, f"{TOKEN_STORAGE_KEY}.{account_id}")
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Lade eine Konfigurationsinstanz nach Optionsänderungen neu."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def create_api_instance(hass: HomeAssistant, email: str, password: str):
     """Erstelle eine API-Instanz und führe den Login durch."""
     try:
@@ -4,234 +4,673 @@ import time
 import logging
 import asyncio
 
+try:
+    import orjson  # Optional fast JSON backend, shipped with Home Assistant
+except ImportError:
+    orjson = None
+
+from .circuit_breaker import CircuitBreaker
+from .models import FanState, LightState
+from .rate_limit import COMMAND, POLL, RateLimiter
+from .scheduler import RequestScheduler
+from .stats import ApiStats
+
 _LOGGER = logging.getLogger(__name__)
 
+CONNECTION_LIMIT = 10  # Maximum simultaneous connections in the pool
+DNS_CACHE_TTL = 300  # Seconds to cache the resolved API host
+KEEPALIVE_TIMEOUT = 60  # Seconds an idle connection stays open for reuse
+RESPONSE_CACHE_TTL = 1.0  # Seconds a device list can be reused by later callers
+FIRST_PAGE = 0  # Page number the app sends for the first device list page
+COMMAND_DEBOUNCE = 0.3  # Seconds to wait for a newer adjustLight value
+# Seconds after which the token is refreshed ahead; None waits for code 102,
+# since the cloud does not report when a token expires
+TOKEN_MAX_AGE = None
+TOKEN_EXPIRED_CODE = "102"
+REQUEST_TIMEOUT = 15  # Seconds before a single request is abandoned
+
+BASE_URL = "https://api.lgledsolutions.com/api/android"
+
+LOGIN_ENDPOINT = "/ulogin/mailLogin/v1"
+DEVICE_LIST_ENDPOINT = "/udm/getDeviceList/v1"
+SWITCH_ENDPOINT = "/udm/lampSwitch/v1"
+ADJUST_LIGHT_ENDPOINT = "/udm/adjustLight/v1"
+
+# Short names used for the diagnostic entities of each endpoint
+API_ENDPOINTS = {
+    LOGIN_ENDPOINT: "login",
+    DEVICE_LIST_ENDPOINT: "device_list",
+    SWITCH_ENDPOINT: "lamp_switch",
+    ADJUST_LIGHT_ENDPOINT: "adjust_light",
+}
+
+
+# Fields of the systemData header that never change, in the app's order
+SYSTEM_DATA_FIELDS = {
+    "appVersion": "1.2.0",
+    "osType": "android",
+    "osVersion": "14",
+    "deviceType": "SM-S928C",
+}
+SYSTEM_DATA_NETWORK = {"netType": "wifi", "wifiName": "123"}
+SYSTEM_DATA_LOCALE = {"timezone": "Europe/Berlin", "language": "German"}
+
+
+if orjson is not None:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:
+
+    def json_dumps(data):
+        """Encode a request body to bytes."""
+        return json.dumps(data).encode()
+
+    json_loads = json.loads
+
+
+def _json_fields(fields):
+    """Encode dict items as they appear inside a json.dumps object."""
+    return json.dumps(fields)[1:-1]
+
+
+class MarsHydroAPIError(Exception):
+    """Raised when the Mars Hydro API answers with an error code."""
+
+
+class MarsHydroCircuitOpenError(MarsHydroAPIError):
+    """Raised without sending a request while the cloud is considered down."""
+
+
+def _group_key(group_id):
+    """Key of a group among the device ids of commands and pending values."""
+    return f"group:{group_id}"
+
+
+class _LazyJson:
+    """Pretty-print JSON only when a log record is actually emitted."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data, indent=2)
+
 
 class MarsHydroAPI:
-    def __init__(self, email, password):
+    def __init__(self, email, password, session=None, rate_limiter=None, base_url=None):
         self.email = email
         self.password = password
         self.token = None
-        self.base_url = "https://api.lgledsolutions.com/api/android"
-        self.api_lock = asyncio.Lock()
+        self.base_url = base_url or BASE_URL
+        # Commands run per device, polls up to a read limit
+        self.scheduler = RequestScheduler()
         self.last_login_time = 0
         self.login_interval = 300  # Minimum interval between logins in seconds
+        self.token_max_age = TOKEN_MAX_AGE
+        self._token_lock = asyncio.Lock()  # Only token refreshes are exclusive here
+        self.on_token_refreshed = None  # Called with (token, last_login_time)
         self.device_id = None  # Added device_id attribute to store dynamically
+        # Sessions passed in (Home Assistant's) are released by their owner
+        self._session = session
+        self._owns_session = False
+        self.cache_ttl = RESPONSE_CACHE_TTL
+        self._inflight = {}  # (endpoint, product_type) -> pending future
+        self._response_cache = {}  # (endpoint, product_type) -> (monotonic, result)
+        self.devices = {"LIGHT": {}, "WIND": {}}  # product_type -> {id: data}
+        self.command_debounce = COMMAND_DEBOUNCE
+        self._pending_adjust = {}  # device id or "group:<id>" -> queued value
+        self._state_listeners = []
+        self._write_seq = 0  # Incremented by every write-through
+        self._written_seq = {}  # device_id -> _write_seq of its last write
+        self.stats = ApiStats()
+        self.circuit = CircuitBreaker()
+        # Shared by every client of the same account when passed in
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self._system_data_key = None  # (device_id, token) of the cached template
+        self._system_data_template = None
+
+    def _get_session(self):
+        """Return the long-lived session.
+
+        Without a session passed in (the scripts), a pooled one is created on
+        first use and closed by close().
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the connection pool if it is owned by this client."""
+        for pending in self._pending_adjust.values():
+            pending["handle"].cancel()
+            for future in pending["futures"]:
+                future.cancel()
+        self._pending_adjust.clear()
+        for future in list(self._inflight.values()):
+            future.cancel()
+        await self.scheduler.close()
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._owns_session = False
 
     async def login(self):
         """Authenticate and retrieve the token."""
-        async with self.api_lock:
+        async with self._token_lock:
             now = time.time()
             if self.token and (now - self.last_login_time < self.login_interval):
                 _LOGGER.info("Token still valid, skipping login.")
                 return
+            await self._login()
 
-            system_data = self._generate_system_data()
-            headers = {"systemData": system_data, "Content-Type": "application/json"}
-            payload = {
-                "email": self.email,
-                "password": self.password,
-                "loginMethod": "1",
-            }
+    async def _login(self):
+        """Request a new token; the caller must hold the token lock."""
+        payload = {
+            "email": self.email,
+            "password": self.password,
+            "loginMethod": "1",
+        }
+        data = await self._send(LOGIN_ENDPOINT, payload)
+        if data.get("code") != "000":
+            raise MarsHydroAPIError(f"Login failed: {data.get('msg')}")
+        self.token = data["data"]["token"]
+        self.last_login_time = time.time()
+        _LOGGER.info("Login erfolgreich, Token erhalten.")
+        if self.on_token_refreshed:
+            self.on_token_refreshed(self.token, self.last_login_time)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/ulogin/mailLogin/v1",
-                    headers=headers,
-                    json=payload,
-                ) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    _LOGGER.info("API Login Response: %s", json.dumps(data, indent=2))
-                    self.token = data["data"]["token"]
-                    self.last_login_time = now
-                    _LOGGER.info("Login erfolgreich, Token erhalten.")
+    def restore_token(self, token, last_login_time):
+        """Reuse a token from an earlier session; it is validated on first use."""
+        self.token = token
+        self.last_login_time = last_login_time
+
+    async def _refresh_token(self, stale_token):
+        """Replace a stale token, letting exactly one refresh run at a time.
+
+        Callers that waited for the lock while another refresh ran find a
+        token different from the one they saw and skip the login.
+        """
+        async with self._token_lock:
+            if self.token is not None and self.token != stale_token:
+                return
+            await self._login()
 
     async def safe_api_call(self, func, *args, **kwargs):
-        """Ensure thread-safe API calls."""
-        async with self.api_lock:
-            return await func(*args, **kwargs)
+        """Run an API call, failing fast while the circuit is open.
+
+        Concurrency is handled per request: commands are serialized per
+        device and polls share the read limit of the scheduler.
+        """
+        self._check_circuit()
+        return await func(*args, **kwargs)
+
+    async def _command(self, key, endpoint, payload):
+        """Send a command after the earlier commands to the same target."""
+        return await self._schedule(COMMAND, self._post, endpoint, payload, key=key)
+
+    async def _schedule(self, lane, func, *args, key=None):
+        """Queue a request in the command or poll lane and return its result."""
+        self._check_circuit()
+        # Wait for the budget before queueing, so a throttled poll never
+        # holds up a command that is ready to be sent
+        await self.rate_limiter.acquire(lane)
+        return await self.scheduler.run(lane, func, *args, key=key)
 
     async def _ensure_token(self):
-        """Ensure that the token is valid."""
-        if not self.token:
-            await self.login()
+        """Ensure that there is a token, optionally refreshing it ahead of time.
 
-    async def toggle_switch(self, is_close: bool, device_id: str):
-        """Toggle the light or fan switch (on/off)."""
+        Expired tokens are otherwise renewed by the code 102 retry in _post.
+        Token refresh is the only exclusive operation: requests about to be
+        sent wait until a running refresh has finished.
+        """
+        max_age = self.token_max_age
+        if not self.token or (
+            max_age is not None and time.time() - self.last_login_time > max_age
+        ):
+            await self._refresh_token(self.token)
+        elif self._token_lock.locked():
+            async with self._token_lock:
+                pass
+
+    async def _post(self, endpoint, payload):
+        """Send an authenticated request and return the JSON response.
+
+        This is the single expiry-retry path for all endpoints: on code 102
+        the token is refreshed once and the request is repeated.
+        """
         await self._ensure_token()
+        token = self.token
+        response_json = await self._send(endpoint, payload)
+        if response_json.get("code") == TOKEN_EXPIRED_CODE:
+            _LOGGER.warning("Token expired, re-authenticating...")
+            self.stats.endpoint(endpoint).retries += 1
+            await self._refresh_token(token)
+            response_json = await self._send(endpoint, payload)
+        return response_json
 
-        system_data = self._generate_system_data()
+    async def _send(self, endpoint, payload):
+        """Send a single request to the API."""
         headers = {
-            "systemData": system_data,
+            "Accept-Encoding": "gzip",
             "Content-Type": "application/json",
+            "User-Agent": "Python/3.x",
+            "systemData": self._generate_system_data(),
         }
+        body = json_dumps(payload)
+        if not self.circuit.allow_request():
+            raise self._circuit_open_error()
+        start = time.monotonic()
+        session = self._get_session()
+        try:
+            async with session.post(
+                f"{self.base_url}{endpoint}",
+                headers=headers,
+                data=body,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                response_json = json_loads(await response.read())
+        except asyncio.CancelledError:
+            self.circuit.abort_probe()
+            raise
+        except Exception as e:
+            self.stats.record_request(
+                endpoint, (time.monotonic() - start) * 1000, type(e).__name__
+            )
+            if self._is_outage(e):
+                self.circuit.record_failure()
+                if self.circuit.is_open():
+                    _LOGGER.warning(
+                        "Mars Hydro cloud unreachable, pausing requests for %.0fs",
+                        self.circuit.retry_in(),
+                    )
+            else:
+                self.circuit.record_success()
+            raise
+        self.circuit.record_success()
+        self.stats.record_request(
+            endpoint, (time.monotonic() - start) * 1000, response_json.get("code")
+        )
+        _LOGGER.debug("API response from %s: %s", endpoint, _LazyJson(response_json))
+        return response_json
+
+    @staticmethod
+    def _is_outage(error):
+        """Return True for errors that mean the cloud itself is unavailable."""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    def _check_circuit(self):
+        """Fail fast instead of queueing while the circuit is open."""
+        if self.circuit.is_open():
+            raise self._circuit_open_error()
+
+    def _circuit_open_error(self):
+        """Build the error raised for requests rejected by the circuit breaker."""
+        return MarsHydroCircuitOpenError(
+            "Mars Hydro cloud unavailable, "
+            f"next attempt in {self.circuit.retry_in():.0f}s"
+        )
+
+    async def toggle_switch(self, is_close: bool, device_id: str):
+        """Toggle the light or fan switch (on/off)."""
         payload = {
             "isClose": is_close,
             "deviceId": device_id,  # Use the provided device_id
             "groupId": None,
         }
 
-        _LOGGER.debug(f"Sending toggle switch payload: {json.dumps(payload, indent=2)}")
+        _LOGGER.debug("Sending toggle switch payload: %s", _LazyJson(payload))
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/udm/lampSwitch/v1", headers=headers, json=payload
-            ) as response:
-                response_json = await response.json()
-                _LOGGER.info(
-                    "API Toggle Switch Response: %s",
-                    json.dumps(response_json, indent=2),
-                )
-                if response_json.get("code") == "102":  # Handle token expiration
-                    _LOGGER.warning("Token expired, re-authenticating...")
-                    await self.login()
-                    return await self.toggle_switch(is_close, device_id)
-                return response_json
+        response_json = await self._command(device_id, SWITCH_ENDPOINT, payload)
+        if response_json.get("code") == "000":
+            self._write_through(device_id, is_on=not is_close)
+        return response_json
+
+    async def toggle_group(self, is_close: bool, group_id):
+        """Switch every device of a group with a single request."""
+        payload = {"isClose": is_close, "deviceId": None, "groupId": group_id}
 
+        _LOGGER.debug("Sending group toggle switch payload: %s", _LazyJson(payload))
+
+        response_json = await self._command(
+            _group_key(group_id), SWITCH_ENDPOINT, payload
+        )
+        if response_json.get("code") == "000":
+            self._write_through_group(group_id, ("LIGHT", "WIND"), is_on=not is_close)
+        return response_json
 
     async def _process_device_list(self, product_type):
-        """Retrieve device list for a given product type."""
+        """Retrieve device list for a given product type.
+
+        Concurrent callers share a single in-flight request, and a result
+        younger than ``cache_ttl`` seconds is returned without a new call.
+        """
+        key = (DEVICE_LIST_ENDPOINT, product_type)
+        cached = self._response_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_device_list(product_type))
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda done: self._finish_inflight_request(key, done)
+            )
+        # Shield the shared request so one cancelled caller does not abort it
+        return await asyncio.shield(future)
+
+    def _finish_inflight_request(self, key, future):
+        """Drop a finished request from the in-flight table and cache its result."""
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._response_cache[key] = (time.monotonic(), future.result())
+
+    async def _fetch_device_list(self, product_type):
+        """Walk every page of the device list and index the devices by id.
+
+        When the first page reports a total, the remaining pages are requested
+        concurrently; otherwise pages are walked until one adds no new devices.
+        """
         await self._ensure_token()
-        system_data = self._generate_system_data()
-        headers = {
-            "Accept-Encoding": "gzip",
-            "Content-Type": "application/json",
-            "Host": "api.lgledsolutions.com",
-            "User-Agent": "Python/3.x",
-            "systemData": system_data,
-        }
-        payload = {"currentPage": 0, "type": None, "productType": product_type}
+        started_seq = self._write_seq
+        first_page, total = await self._request_device_page(product_type, FIRST_PAGE)
+        index = {}
+        self._add_to_index(index, first_page)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/udm/getDeviceList/v1", headers=headers, json=payload
-            ) as response:
-                response_json = await response.json()
-                if response_json.get("code") == "000":
-                    device_list = response_json.get("data", {}).get("list", [])
-                    return device_list
-                else:
-                    _LOGGER.error("Error in API response: %s", response_json.get("msg"))
-                    return []
-
-    async def get_lightdata(self):
-        """Retrieve light data from the Mars Hydro API."""
-        device_list = await self._process_device_list("LIGHT")
-        if device_list:
-            device_data = device_list[0]
-            self.device_id = device_data.get("id")  # Store dynamic device_id
-            return {
-                "deviceName": device_data.get("deviceName"),
-                "deviceLightRate": device_data.get("deviceLightRate"),
-                "isClose": device_data.get("isClose"),
-                "id": self.device_id,
-                "deviceImage": device_data.get("deviceImg"),
-            }
+        next_page = FIRST_PAGE + 1
+        if total and first_page and len(index) < total:
+            page_count = -(-total // len(first_page))  # ceil division
+            pages = range(next_page, FIRST_PAGE + page_count)
+            results = await asyncio.gather(
+                *(self._request_device_page(product_type, page) for page in pages)
+            )
+            for device_list, _ in results:
+                self._add_to_index(index, device_list)
+            next_page = FIRST_PAGE + page_count
+
+        # Fall back to sequential paging if the total was missing or unreliable
+        while first_page and (total is None or len(index) < total):
+            device_list, _ = await self._request_device_page(product_type, next_page)
+            if not self._add_to_index(index, device_list):
+                break
+            next_page += 1
+
+        # Parsed once here; all entities of a device share the same state object
+        parse = LightState.from_api if product_type == "LIGHT" else FanState.from_api
+        devices = {device_id: parse(data) for device_id, data in index.items()}
+        # Commands acknowledged while the pages were in flight are newer
+        # than what the cloud reported for those devices
+        current = self.devices[product_type]
+        for device_id in devices:
+            if (
+                self._written_seq.get(device_id, 0) > started_seq
+                and device_id in current
+            ):
+                devices[device_id] = current[device_id]
+        self.devices[product_type] = devices
+        _LOGGER.debug("Indexed %d %s devices", len(devices), product_type)
+        return devices
+
+    @staticmethod
+    def _add_to_index(index, device_list):
+        """Add raw devices to an id-keyed index and return how many were new."""
+        added = 0
+        for device_data in device_list:
+            device_id = device_data.get("id")
+            if device_id is not None and device_id not in index:
+                index[device_id] = device_data
+                added += 1
+        return added
+
+    async def _request_device_page(self, product_type, page):
+        """Request one page of the device list and return it with the total."""
+        return await self._schedule(POLL, self._request_device_list, product_type, page)
+
+    async def _request_device_list(self, product_type, page):
+        """Send a single getDeviceList request."""
+        payload = {"currentPage": page, "type": None, "productType": product_type}
+        response_json = await self._post(DEVICE_LIST_ENDPOINT, payload)
+        if response_json.get("code") == "000":
+            data = response_json.get("data") or {}
+            return data.get("list") or [], data.get("total")
         else:
-            _LOGGER.warning("No light devices found.")
-            return None
-
-    async def get_fandata(self):
-        """Retrieve fan data from the Mars Hydro API."""
-        device_list = await self._process_device_list("WIND")
-        if device_list:
-            device_data = device_list[0]
-            _LOGGER.debug("Fan data retrieved: %s", json.dumps(device_data, indent=2))
-            return {
-                "deviceName": device_data.get("deviceName"),
-                "deviceLightRate": device_data.get("deviceLightRate"),
-                "humidity": device_data.get("humidity"),
-                "temperature": device_data.get("temperature"),
-                "speed": device_data.get("speed"),
-                "isClose": device_data.get("isClose"),
-                "id": device_data.get("id"),
-                "deviceImage": device_data.get("deviceImg"),
-            }
+            _LOGGER.error("Error in API response: %s", response_json.get("msg"))
+            raise MarsHydroAPIError(response_json.get("msg"))
+
+    async def get_lights(self):
+        """Retrieve all lights from the Mars Hydro API, keyed by device id."""
+        lights = await self._process_device_list("LIGHT")
+        if lights:
+            # systemData carries a device id; keep using the first light as before
+            self.device_id = self.device_id or next(iter(lights))
         else:
+            _LOGGER.warning("No light devices found.")
+        return lights
+
+    async def get_fans(self):
+        """Retrieve all fans from the Mars Hydro API, keyed by device id."""
+        fans = await self._process_device_list("WIND")
+        if not fans:
             _LOGGER.warning("No fan devices found.")
-            return None
+        return fans
 
-    async def set_brightness(self, brightness):
-        """Set the brightness of the Mars Hydro light."""
-        await self._ensure_token()
+    def add_state_listener(self, listener):
+        """Register a callback for device state written through by commands.
 
-        if not self.device_id:
-            device_data = await self.get_lightdata()
-            if device_data:
-                self.device_id = device_data.get("id")
+        The listener is called with the product type and the updated device
+        index. Returns a function that removes the listener again.
+        """
+        self._state_listeners.append(listener)
+        return lambda: self._state_listeners.remove(listener)
 
-        system_data = self._generate_system_data()
-        headers = {
-            "Accept-Encoding": "gzip",
-            "Content-Type": "application/json",
-            "Host": "api.lgledsolutions.com",
-            "systemData": system_data,
-            "User-Agent": "Python/3.x",
-        }
-        payload = {
-            "light": brightness,
-            "deviceId": self.device_id,
-            "groupId": None,
-        }
+    def _write_through(self, device_id, **fields):
+        """Apply an acknowledged command to the cached device state."""
+        for product_type, devices in self.devices.items():
+            if device_id in devices:
+                self._apply_write_through(product_type, [device_id], fields)
+                return
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/udm/adjustLight/v1", headers=headers, json=payload
-            ) as response:
-                response_json = await response.json()
-                _LOGGER.info(
-                    "API Set Brightness Response: %s",
-                    json.dumps(response_json, indent=2),
-                )
-                return response_json
+    def _write_through_group(self, group_id, product_types, **fields):
+        """Apply an acknowledged group command to all members of the group."""
+        for product_type in product_types:
+            device_ids = [
+                device_id
+                for device_id, state in self.devices[product_type].items()
+                if state.group_id == group_id
+            ]
+            if device_ids:
+                self._apply_write_through(product_type, device_ids, fields)
+
+    def _apply_write_through(self, product_type, device_ids, fields):
+        # Copy on write so snapshots handed out earlier stay unchanged
+        devices = dict(self.devices[product_type])
+        self._write_seq += 1
+        for device_id in device_ids:
+            self._written_seq[device_id] = self._write_seq
+            devices[device_id] = devices[device_id].replace(**fields)
+        self.devices[product_type] = devices
+        self._response_cache.pop((DEVICE_LIST_ENDPOINT, product_type), None)
+        for listener in self._state_listeners:
+            listener(product_type, devices)
+
+    def get_device(self, device_id, product_type=None):
+        """Return the last known data for a device without scanning any list."""
+        if product_type is not None:
+            return self.devices[product_type].get(device_id)
+        for devices in self.devices.values():
+            if device_id in devices:
+                return devices[device_id]
+        return None
+
+    async def set_brightness(self, brightness, light_device_id):
+        """Set the brightness of a Mars Hydro light."""
+        return await self._adjust_light_debounced(brightness, light_device_id)
 
     async def set_fanspeed(self, speed, fan_device_id):
         """Set the speed of the Mars Hydro fan."""
-        await self._ensure_token()
+        return await self._adjust_light_debounced(speed, fan_device_id)
 
-        system_data = self._generate_system_data()
-        headers = {
-            "Accept-Encoding": "gzip",
-            "Content-Type": "application/json",
-            "Host": "api.lgledsolutions.com",
-            "systemData": system_data,
-            "User-Agent": "Python/3.x",
-        }
+    async def set_group_brightness(self, brightness, group_id):
+        """Set the brightness of every light in a group with one request."""
+        return await self._adjust_light_debounced(brightness, None, group_id)
+
+    async def adjust_light_now(self, value, device_id):
+        """Send a final brightness or fan speed right away, without debouncing.
+
+        A debounced value still waiting for the device is superseded; its
+        callers get the response of this request.
+        """
+        pending = self._pending_adjust.pop(device_id, None)
+        if pending is None:
+            pending = {"futures": [], "device_id": device_id, "group_id": None}
+        else:
+            pending["handle"].cancel()
+            _LOGGER.debug("Superseding pending adjustLight value for %s", device_id)
+        pending["value"] = value
+        future = asyncio.get_running_loop().create_future()
+        pending["futures"].append(future)
+        await self._send_adjust_light(pending)
+        return await future
+
+    async def _adjust_light_debounced(self, value, device_id, group_id=None):
+        """Queue an adjustLight value for a target and wait for it to be sent.
+
+        Values arriving within ``command_debounce`` seconds of each other are
+        collapsed so only the last one is sent; every caller of the burst gets
+        the response of that final request. The target is a device or, if
+        ``group_id`` is given, a group.
+        """
+        key = device_id if group_id is None else _group_key(group_id)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending_adjust.get(key)
+        if pending is None:
+            pending = self._pending_adjust[key] = {
+                "futures": [],
+                "device_id": device_id,
+                "group_id": group_id,
+            }
+        else:
+            pending["handle"].cancel()
+            _LOGGER.debug("Superseding pending adjustLight value for %s", key)
+        pending["value"] = value
+        pending["futures"].append(future)
+        pending["handle"] = loop.call_later(
+            self.command_debounce, self._flush_adjust_light, key
+        )
+        return await future
+
+    def _flush_adjust_light(self, key):
+        """Send the last queued adjustLight value of a target."""
+        pending = self._pending_adjust.pop(key)
+        asyncio.ensure_future(self._send_adjust_light(pending))
+
+    async def _send_adjust_light(self, pending):
+        """Send one adjustLight request and resolve all waiting callers."""
+        futures = pending["futures"]
+        try:
+            response_json = await self.safe_api_call(
+                self._adjust_light,
+                pending["value"],
+                pending["device_id"],
+                pending["group_id"],
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(response_json)
+
+    async def _adjust_light(self, value, device_id, group_id=None):
+        """Set the brightness or fan speed of a device, or a group's lights."""
         payload = {
-            "light": speed,
-            "deviceId": fan_device_id,
-            "groupId": None,
+            "light": value,
+            "deviceId": device_id,
+            "groupId": group_id,
         }
 
-        _LOGGER.debug(f"Sending fan speed payload: {json.dumps(payload, indent=2)}")
+        _LOGGER.debug("Sending adjust light payload: %s", _LazyJson(payload))
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/udm/adjustLight/v1", headers=headers, json=payload
-            ) as response:
-                response_json = await response.json()
-                _LOGGER.info(
-                    "API Set Fan Speed Response: %s",
-                    json.dumps(response_json, indent=2),
-                )
-                return response_json
+        key = device_id if group_id is None else _group_key(group_id)
+        response_json = await self._command(key, ADJUST_LIGHT_ENDPOINT, payload)
+        if response_json.get("code") == "000":
+            if group_id is None:
+                self._write_through(device_id, light_rate=value)
+            else:
+                self._write_through_group(group_id, ("LIGHT",), light_rate=value)
+        return response_json
+
+    def get_diagnostics(self):
+        """Return a snapshot of the client state for troubleshooting."""
+        now = time.monotonic()
+        return {
+            "devices": {
+                product_type: {
+                    device_id: state.as_dict() for device_id, state in devices.items()
+                }
+                for product_type, devices in self.devices.items()
+            },
+            "cache_ages": {
+                f"{endpoint} {product_type}": round(now - cached_at, 3)
+                for (endpoint, product_type), (
+                    cached_at,
+                    _,
+                ) in self._response_cache.items()
+            },
+            "inflight_requests": [
+                f"{endpoint} {product_type}"
+                for endpoint, product_type in self._inflight
+            ],
+            "pending_commands": {
+                key: pending["value"] for key, pending in self._pending_adjust.items()
+            },
+            "token": self.token,
+            "token_age": (
+                round(time.time() - self.last_login_time) if self.token else None
+            ),
+            "scheduler": self.scheduler.as_dict(),
+            "circuit_breaker": self.circuit.as_dict(),
+            "rate_limiter": self.rate_limiter.as_dict(),
+            "stats": self.stats.as_dict(),
+        }
 
     def _generate_system_data(self):
-        """Generate systemData payload with dynamic device_id."""
-        return json.dumps(
-            {
-                "reqId": int(time.time() * 1000),
-                "appVersion": "1.2.0",
-                "osType": "android",
-                "osVersion": "14",
-                "deviceType": "SM-S928C",
-                "deviceId": self.device_id,
-                "netType": "wifi",
-                "wifiName": "123",
-                "timestamp": int(time.time()),
-                "token": self.token,
-                "timezone": "Europe/Berlin",
-                "language": "German",
-            }
-        )
+        """Generate the systemData header for the current device id and token.
+
+        Only the request id and timestamp change per request; the rest is
+        encoded into a template once per device id and token. The result is
+        identical to ``json.dumps`` of the full header dict.
+        """
+        key = (self.device_id, self.token)
+        if key != self._system_data_key:
+            fixed = (
+                _json_fields(SYSTEM_DATA_FIELDS),
+                _json_fields({"deviceId": self.device_id}),
+                _json_fields(SYSTEM_DATA_NETWORK),
+            )
+            self._system_data_template = (
+                '{"reqId": %d, '
+                + ", ".join(fixed).replace("%", "%%")
+                + ', "timestamp": %d, '
+                + _json_fields({"token": self.token}).replace("%", "%%")
+                + ", "
+                + _json_fields(SYSTEM_DATA_LOCALE).replace("%", "%%")
+                + "}"
+            )
+            self._system_data_key = key
+        now = time.time()
+        return self._system_data_template % (int(now * 1000), int(now))
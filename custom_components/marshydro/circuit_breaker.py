@@ -0,0 +1,91 @@
+"""Circuit breaker for the Mars Hydro cloud connection."""
+
+import random
+import time
+
+FAILURE_THRESHOLD = 5  # Consecutive failures before the circuit opens
+BASE_BACKOFF = 10  # Seconds before the first recovery probe
+MAX_BACKOFF = 300  # Upper bound for the wait between probes
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop sending requests after repeated failures and probe for recovery.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens and all
+    requests fail fast. Once the jittered, exponentially growing backoff has
+    passed a single probe request is let through; its success closes the
+    circuit again, its failure reopens it with a longer backoff.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=FAILURE_THRESHOLD,
+        base_backoff=BASE_BACKOFF,
+        max_backoff=MAX_BACKOFF,
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.open_count = 0  # Consecutive openings, drives the backoff
+        self.open_until = 0.0
+
+    def is_open(self):
+        """Return True while requests must fail fast."""
+        if self.state == STATE_OPEN:
+            return time.monotonic() < self.open_until
+        # While half open only the probe already in flight may run
+        return self.state == STATE_HALF_OPEN
+
+    def allow_request(self):
+        """Return True if a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self.open_until:
+            self.state = STATE_HALF_OPEN
+            return True
+        return False
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.open_count = 0
+
+    def record_failure(self):
+        """Count a failed request and open the circuit when needed."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def abort_probe(self):
+        """Let the next request probe again if a probe was cancelled."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+            self.open_until = time.monotonic()
+
+    def retry_in(self):
+        """Return the seconds until the next recovery probe."""
+        return max(0.0, self.open_until - time.monotonic())
+
+    def _open(self):
+        """Open the circuit with a jittered exponential backoff."""
+        self.open_count += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.open_count - 1))
+        # Jitter keeps several clients from probing in lockstep
+        self.open_until = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+        self.state = STATE_OPEN
+
+    def as_dict(self):
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_count": self.open_count,
+            "retry_in": round(self.retry_in(), 1),
+        }
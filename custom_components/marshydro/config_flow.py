@@ -1,8 +1,22 @@
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import voluptuous as vol
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_UPDATE_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MAX_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    FAST_UPDATE_INTERVAL,
+    CONF_POLL_RATE_LIMIT,
+    CONF_COMMAND_RATE_LIMIT,
+    CONF_MAX_PARALLEL_READS,
+)
+from .rate_limit import DEFAULT_COMMAND_RATE, DEFAULT_POLL_RATE
+from .scheduler import DEFAULT_READ_LIMIT, MAX_READ_LIMIT
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -55,7 +69,7 @@ class MarsHydroConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Test the API login."""
         from .api import MarsHydroAPI
 
-        api = MarsHydroAPI(email, password)
+        api = MarsHydroAPI(email, password, async_get_clientsession(self.hass))
         try:
             await api.login()
             return True
@@ -91,9 +105,35 @@ class MarsHydroOptionsFlow(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        options = self.config_entry.options
         options_schema = vol.Schema(
             {
-                vol.Required("update_interval", default=30): int,
+                vol.Required(
+                    CONF_UPDATE_INTERVAL,
+                    default=options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=FAST_UPDATE_INTERVAL)),
+                vol.Required(
+                    CONF_ADAPTIVE_POLLING,
+                    default=options.get(CONF_ADAPTIVE_POLLING, True),
+                ): bool,
+                vol.Required(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=FAST_UPDATE_INTERVAL)),
+                vol.Required(
+                    CONF_POLL_RATE_LIMIT,
+                    default=options.get(CONF_POLL_RATE_LIMIT, DEFAULT_POLL_RATE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Required(
+                    CONF_COMMAND_RATE_LIMIT,
+                    default=options.get(CONF_COMMAND_RATE_LIMIT, DEFAULT_COMMAND_RATE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Required(
+                    CONF_MAX_PARALLEL_READS,
+                    default=options.get(CONF_MAX_PARALLEL_READS, DEFAULT_READ_LIMIT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_READ_LIMIT)),
             }
         )
 
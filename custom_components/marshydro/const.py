@@ -1,3 +1,22 @@
 DOMAIN = "marshydro"
 CONF_USERNAME = "username"
-CONF_PASSWORD = "password"
\ No newline at end of file
+CONF_PASSWORD = "password"
+
+DEFAULT_UPDATE_INTERVAL = 30  # Seconds between coordinator refreshes
+DEFAULT_MAX_UPDATE_INTERVAL = 300  # Ceiling for adaptive polling while idle
+FAST_UPDATE_INTERVAL = 5  # Seconds between refreshes right after a change
+FAST_POLL_WINDOW = 60  # Seconds to keep polling fast after a change
+POLL_BACKOFF_FACTOR = 1.5  # Interval growth per unchanged refresh
+
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_POLL_RATE_LIMIT = "poll_rate_limit"
+CONF_COMMAND_RATE_LIMIT = "command_rate_limit"
+CONF_MAX_PARALLEL_READS = "max_parallel_reads"
+
+DEFAULT_APPLY_CONCURRENCY = 4  # Devices apply_state works on at once
+MAX_APPLY_CONCURRENCY = 20
+
+STORAGE_VERSION = 1
+TOKEN_STORAGE_KEY = f"{DOMAIN}.token"
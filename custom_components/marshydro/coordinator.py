@@ -0,0 +1,168 @@
+import asyncio
+from datetime import timedelta
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import MarsHydroAPI
+from .models import group_devices
+from .const import (
+    DOMAIN,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    FAST_UPDATE_INTERVAL,
+    FAST_POLL_WINDOW,
+    POLL_BACKOFF_FACTOR,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MarsHydroDataUpdateCoordinator(DataUpdateCoordinator):
+    """Fetch light and fan data once per cycle and share it with all entities.
+
+    Command results written through by the API are applied to the shared
+    snapshot immediately, so all entities of a device update together.
+
+    With adaptive polling enabled the coordinator polls every
+    FAST_UPDATE_INTERVAL seconds for a short window after a command or a
+    detected change of controllable state (power, level, devices added or
+    removed), then backs off from the configured interval towards
+    max_update_interval while readings stay stable. Drifting sensor readings
+    only hold the current interval.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: MarsHydroAPI,
+        update_interval=DEFAULT_UPDATE_INTERVAL,
+        adaptive=True,
+        max_update_interval=DEFAULT_MAX_UPDATE_INTERVAL,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=update_interval),
+        )
+        self.api = api
+        self._fast_poll_until = 0
+        self.changed_ids = set()  # Devices that differ from the previous snapshot
+        self.control_changed = False  # Power, level or the device set changed
+        self.configure(update_interval, adaptive, max_update_interval)
+        self._remove_state_listener = api.add_state_listener(self._handle_write_through)
+
+    def configure(self, update_interval, adaptive, max_update_interval):
+        """Apply polling options; a shared coordinator takes the latest ones."""
+        self.adaptive = adaptive
+        self.base_interval = timedelta(seconds=update_interval)
+        self.max_interval = timedelta(seconds=max(update_interval, max_update_interval))
+        self.update_interval = self.base_interval
+
+    async def async_shutdown(self):
+        """Stop polling and stop following command results of the API."""
+        self._remove_state_listener()
+        await super().async_shutdown()
+
+    async def _async_update_data(self):
+        """Fetch the latest light and fan snapshot from the Mars Hydro API."""
+        self.changed_ids = set()
+        self.control_changed = False
+        try:
+            # Both product types are discovered in one concurrent step
+            lights, fans = await asyncio.gather(
+                self.api.get_lights(), self.api.get_fans()
+            )
+        except Exception as e:
+            raise UpdateFailed(f"Error communicating with Mars Hydro API: {e}") from e
+
+        # Both snapshots are keyed by device id
+        data = {
+            "LIGHT": self._diff("LIGHT", lights),
+            "WIND": self._diff("WIND", fans),
+        }
+        # Groups are derived from the groupId of the devices
+        data["GROUP"] = group_devices(data["LIGHT"], data["WIND"])
+        if self.adaptive and self.data is not None:
+            self._adapt_interval(
+                changed=self.control_changed, drifted=bool(self.changed_ids)
+            )
+        return data
+
+    def _diff(self, product_type, devices):
+        """Record changed device ids and keep unchanged state objects.
+
+        Reusing the previous object for an unchanged device lets entities and
+        later comparisons skip it cheaply. Changes of power, level or the set
+        of devices also set control_changed.
+        """
+        previous = self.data[product_type] if self.data is not None else {}
+        snapshot = {}
+        for device_id, state in devices.items():
+            old_state = previous.get(device_id)
+            if old_state is not None and (old_state is state or old_state == state):
+                snapshot[device_id] = old_state
+            else:
+                snapshot[device_id] = state
+                self.changed_ids.add(device_id)
+                if (
+                    old_state is None
+                    or old_state.is_on != state.is_on
+                    or old_state.light_rate != state.light_rate
+                ):
+                    self.control_changed = True
+        # Removed devices are reported too so their entities go unavailable
+        removed = previous.keys() - devices.keys()
+        if removed:
+            self.changed_ids.update(removed)
+            self.control_changed = True
+        return snapshot
+
+    def _adapt_interval(self, changed, drifted=False):
+        """Pick the interval for the next refresh based on recent activity.
+
+        ``changed`` restarts the fast window; ``drifted`` (sensor readings
+        moved) only keeps the interval from backing off further.
+        """
+        now = time.monotonic()
+        if changed:
+            self._fast_poll_until = now + FAST_POLL_WINDOW
+
+        if now < self._fast_poll_until:
+            interval = timedelta(seconds=FAST_UPDATE_INTERVAL)
+        elif self.update_interval < self.base_interval:
+            # Fast window just ended, resume at the configured interval
+            interval = self.base_interval
+        elif drifted:
+            interval = self.update_interval
+        else:
+            interval = min(
+                self.update_interval * POLL_BACKOFF_FACTOR, self.max_interval
+            )
+
+        if interval != self.update_interval:
+            _LOGGER.debug("Polling interval changed to %s", interval)
+            self.update_interval = interval
+
+    @callback
+    def _handle_write_through(self, product_type, devices):
+        """Push an acknowledged command result to every entity at once."""
+        if self.data is None:
+            return
+        # Poll fast for a while so the cloud state confirms the command
+        self.async_boost_polling()
+        self.changed_ids = set()
+        devices = self._diff(product_type, devices)
+        self.async_set_updated_data({**self.data, product_type: devices})
+
+    @callback
+    def async_boost_polling(self):
+        """Switch to fast polling after a command was sent to a device."""
+        if not self.adaptive:
+            return
+        self._fast_poll_until = time.monotonic() + FAST_POLL_WINDOW
+        self.update_interval = timedelta(seconds=FAST_UPDATE_INTERVAL)
+        self._schedule_refresh()
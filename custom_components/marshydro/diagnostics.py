@@ -0,0 +1,32 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"email", "password", "token"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    client = hass.data[DOMAIN]["clients"][entry_data["account"]]
+
+    return async_redact_data(
+        {
+            "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+            "coordinator": {
+                "last_update_success": coordinator.last_update_success,
+                # Entries of the same account share one client and coordinator
+                "account_entries": len(client["entries"]),
+                "update_interval": (
+                    coordinator.update_interval.total_seconds()
+                    if coordinator.update_interval
+                    else None
+                ),
+            },
+            "api": entry_data["api"].get_diagnostics(),
+        },
+        TO_REDACT,
+    )
@@ -0,0 +1,36 @@
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+
+class MarsHydroDeviceEntity(CoordinatorEntity):
+    """Coordinator entity of one device that only writes state on changes.
+
+    Subclasses set ``_device_id`` and implement ``_update_from_coordinator``.
+    A refresh rewrites the state only if the coordinator reports the device
+    as changed or the coordinator's availability flipped. Entities covering
+    several devices override ``_is_changed``. An entity marked unavailable
+    locally, e.g. after a failed command, is refreshed on every update
+    until the snapshot makes it available again.
+    """
+
+    _device_id = None
+    _available = True
+    _written_update_success = None
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator."""
+        update_success = self.coordinator.last_update_success
+        if (
+            self._available
+            and not self._is_changed(self.coordinator.changed_ids)
+            and update_success == self._written_update_success
+        ):
+            return
+        self._written_update_success = update_success
+        self._update_from_coordinator()
+        self.async_write_ha_state()
+
+    def _is_changed(self, changed_ids):
+        """Return True if the coordinator changed this entity's device."""
+        return self._device_id in changed_ids
@@ -1,29 +1,36 @@
 from homeassistant.components.fan import FanEntity, FanEntityFeature
 from . import _LOGGER, DOMAIN
+from .entity import MarsHydroDeviceEntity
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the Mars Hydro fan entity."""
     api = hass.data[DOMAIN][entry.entry_id].get("api")
+    coordinator = hass.data[DOMAIN][entry.entry_id].get("coordinator")
 
     if api:
-        fan_entity = MarsHydroFanEntity(api, entry.entry_id)
-        async_add_entities([fan_entity], update_before_add=True)
-        _LOGGER.info("Mars Hydro fan entity added successfully.")
+        fan_entities = [
+            MarsHydroFanEntity(coordinator, api, entry.entry_id, device_id)
+            for device_id in coordinator.data["WIND"]
+        ]
+        async_add_entities(fan_entities)
+        _LOGGER.info(f"Added {len(fan_entities)} Mars Hydro fan entities.")
     else:
         _LOGGER.error("API instance not found. Cannot set up fan entity.")
 
 
-class MarsHydroFanEntity(FanEntity):
+class MarsHydroFanEntity(MarsHydroDeviceEntity, FanEntity):
     """Representation of a Mars Hydro fan."""
 
-    def __init__(self, api, entry_id):
+    def __init__(self, coordinator, api, entry_id, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None
+        self._device_id = device_id
         self._device_name = None
         self._speed_percentage = None
         self._available = True
         self._entry_id = entry_id
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -37,7 +44,7 @@ class MarsHydroFanEntity(FanEntity):
     @property
     def available(self):
         """Return True if the fan is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def percentage(self):
@@ -92,30 +99,23 @@ class MarsHydroFanEntity(FanEntity):
         except Exception as e:
             _LOGGER.error(f"Error in async_set_percentage: {e}")
             self._available = False
+        self.async_write_ha_state()
 
-    async def async_update(self):
-        """Update the fan state."""
+    def _update_from_coordinator(self):
+        """Update the fan state from the shared coordinator snapshot."""
         try:
-            fan_data = await self._api.safe_api_call(self._api.get_fandata)
+            fan_data = self.coordinator.data["WIND"].get(self._device_id)
             if fan_data:
-                self._device_id = fan_data["id"]
-                self._device_name = fan_data["deviceName"]
-                raw_speed = fan_data.get(
-                    "deviceLightRate", 25
-                )  # Use deviceLightRate as the default slider value
-
-                try:
-                    # Convert speed to integer and clamp it
-                    self._speed_percentage = min(max(int(raw_speed), 25), 100)
+                self._device_name = fan_data.name
+                # deviceLightRate is the speed slider, clamped by the model
+                self._speed_percentage = fan_data.percentage
+                if self._speed_percentage is not None:
                     self._available = True
                     _LOGGER.info(
                         f"Fan state updated: {self._speed_percentage}% for {self._device_name}"
                     )
-                except ValueError:
-                    _LOGGER.warning(
-                        f"Invalid speed data for fan {self._device_name}: {raw_speed}"
-                    )
-                    self._speed_percentage = None
+                else:
+                    _LOGGER.warning(f"Invalid speed data for fan {self._device_name}")
                     self._available = False
             else:
                 self._available = False
@@ -1,5 +1,6 @@
 from homeassistant.components.light import LightEntity, ATTR_BRIGHTNESS
 from . import _LOGGER, DOMAIN
+from .entity import MarsHydroDeviceEntity
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
@@ -7,23 +8,35 @@ async def async_setup_entry(hass, entry, async_add_entities):
     _LOGGER.debug("Mars Hydro Light async_setup_entry called")
 
     api = hass.data[DOMAIN][entry.entry_id].get("api")
+    coordinator = hass.data[DOMAIN][entry.entry_id].get("coordinator")
 
     if api:
-        light = MarsHydroBrightnessLight(api, entry.entry_id)
-        async_add_entities([light], update_before_add=True)
-
-
-class MarsHydroBrightnessLight(LightEntity):
+        lights = [
+            MarsHydroBrightnessLight(coordinator, api, entry.entry_id, device_id)
+            for device_id in coordinator.data["LIGHT"]
+        ]
+        # One light per group with lights, switched with a single request
+        lights += [
+            MarsHydroGroupLight(coordinator, api, entry.entry_id, group_id)
+            for group_id, group in coordinator.data["GROUP"].items()
+            if group.light_ids
+        ]
+        async_add_entities(lights)
+
+
+class MarsHydroBrightnessLight(MarsHydroDeviceEntity, LightEntity):
     """Representation of the Mars Hydro Light with brightness control only."""
 
-    def __init__(self, api, entry_id):
+    def __init__(self, coordinator, api, entry_id, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None  # To store the dynamic device_id
+        self._device_id = device_id
         self._device_name = None  # To store the dynamic deviceName
         self._brightness = None
         self._available = False
         self._state = None
         self._entry_id = entry_id
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -42,7 +55,7 @@ class MarsHydroBrightnessLight(LightEntity):
     @property
     def available(self):
         """Return True if entity is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def is_on(self):
@@ -88,25 +101,21 @@ class MarsHydroBrightnessLight(LightEntity):
         brightness = kwargs.get(ATTR_BRIGHTNESS, 255)  # Default to max brightness
         await self.async_set_brightness(brightness)
         self._state = True
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn off the light by setting brightness to 0."""
         await self.async_set_brightness(0)
         self._state = False
+        self.async_write_ha_state()
 
     async def async_set_brightness(self, brightness: int):
         """Set the brightness of the light."""
         try:
             brightness_percentage = round((brightness / 255) * 100)
-            response = await self._api.safe_api_call(
-                self._api.set_brightness, brightness_percentage
+            response = await self._api.set_brightness(
+                brightness_percentage, self._device_id
             )
-            if response.get("code") == "102":
-                _LOGGER.warning("Token expired, re-authenticating...")
-                await self._api.login()
-                response = await self._api.safe_api_call(
-                    self._api.set_brightness, brightness_percentage
-                )
 
             if response.get("code") != "000":
                 raise Exception(f"API Error: {response.get('msg')}")
@@ -119,19 +128,14 @@ class MarsHydroBrightnessLight(LightEntity):
             self._available = False
             _LOGGER.error(f"Error setting brightness: {e}")
 
-    async def async_update(self):
-        """Update the light's state."""
+    def _update_from_coordinator(self):
+        """Update the light's state from the shared coordinator snapshot."""
         try:
-            light_data = await self._api.safe_api_call(self._api.get_lightdata)
+            light_data = self.coordinator.data["LIGHT"].get(self._device_id)
             if light_data:
-                self._device_id = light_data[
-                    "id"
-                ]  # Set device_id dynamically from the API response
-                self._device_name = light_data[
-                    "deviceName"
-                ]  # Set deviceName dynamically
-                self._brightness = int((light_data["deviceLightRate"] / 100) * 255)
-                self._state = not light_data["isClose"]
+                self._device_name = light_data.name  # Set deviceName dynamically
+                self._brightness = light_data.brightness
+                self._state = light_data.is_on
                 self._available = True
                 _LOGGER.info(
                     f"Updated light: {self._device_name}, brightness: {self._brightness}"
@@ -144,3 +148,72 @@ class MarsHydroBrightnessLight(LightEntity):
             self._available = False
             self._state = None
             _LOGGER.error(f"Error updating light state: {e}")
+
+
+class MarsHydroGroupLight(MarsHydroBrightnessLight):
+    """All lights of a Mars Hydro group, dimmed with one groupId command."""
+
+    def __init__(self, coordinator, api, entry_id, group_id):
+        self._group_id = group_id
+        self._member_ids = ()
+        super().__init__(coordinator, api, entry_id, None)
+
+    @property
+    def name(self):
+        """Return the name of the group light."""
+        return f"{self._device_name or 'Mars Hydro'} Group Light ({self._group_id})"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the group light."""
+        return f"{self._entry_id}_group_light_{self._group_id}"
+
+    @property
+    def device_info(self):
+        """Return device information for the group."""
+        return {
+            "identifiers": {(DOMAIN, f"group_{self._group_id}")},
+            "name": self._device_name or f"Mars Hydro Group {self._group_id}",
+            "manufacturer": "Mars Hydro",
+            "model": "Mars Hydro Group",
+        }
+
+    async def async_set_brightness(self, brightness: int):
+        """Set the brightness of every light in the group."""
+        try:
+            brightness_percentage = round((brightness / 255) * 100)
+            response = await self._api.set_group_brightness(
+                brightness_percentage, self._group_id
+            )
+
+            if response.get("code") != "000":
+                raise Exception(f"API Error: {response.get('msg')}")
+
+            self._brightness = brightness
+            self._state = brightness > 0
+            self._available = True
+            _LOGGER.info(
+                f"Group {self._group_id} brightness set to {brightness_percentage}%"
+            )
+        except Exception as e:
+            self._available = False
+            _LOGGER.error(f"Error setting group brightness: {e}")
+
+    def _is_changed(self, changed_ids):
+        """Return True if any member light changed or the members did."""
+        group = self.coordinator.data["GROUP"].get(self._group_id)
+        light_ids = group.light_ids if group else ()
+        return light_ids != self._member_ids or not changed_ids.isdisjoint(light_ids)
+
+    def _update_from_coordinator(self):
+        """Aggregate the member lights from the shared coordinator snapshot."""
+        group = self.coordinator.data["GROUP"].get(self._group_id)
+        if group is None or not group.light_ids:
+            self._member_ids = ()
+            self._available = False
+            _LOGGER.warning(f"Group {self._group_id} has no lights anymore")
+            return
+        self._member_ids = group.light_ids
+        self._device_name = group.name
+        self._state, self._brightness = group.state(self.coordinator.data["LIGHT"], {})
+        self._available = True
@@ -0,0 +1,220 @@
+"""Parsed device state shared read-only by all entities of a device."""
+
+MIN_FAN_PERCENTAGE = 25  # Lowest speed the fans accept
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _brightness(light_rate):
+    """Convert a 0-100 light rate to Home Assistant's 0-255 brightness."""
+    return None if light_rate is None else int(light_rate / 100 * 255)
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class DeviceState:
+    """Immutable snapshot of one device as reported by the device list.
+
+    Raw fields are parsed and derived values computed once per response;
+    entities only read attributes. Use ``replace`` to get an updated copy.
+    """
+
+    __slots__ = (
+        "device_id",
+        "name",
+        "image",
+        "is_on",
+        "light_rate",
+        "group_id",
+        "group_name",
+    )
+    _init_fields = __slots__  # Fields passed to the constructor
+
+    def __init__(
+        self, device_id, name, image, is_on, light_rate, group_id=None, group_name=None
+    ):
+        _set = object.__setattr__
+        _set(self, "device_id", device_id)
+        _set(self, "name", name)
+        _set(self, "image", image)
+        _set(self, "is_on", is_on)
+        _set(self, "light_rate", light_rate)
+        _set(self, "group_id", group_id)
+        _set(self, "group_name", group_name)
+
+    @classmethod
+    def _common_fields(cls, data):
+        is_close = data.get("isClose")
+        return {
+            "device_id": data.get("id"),
+            "name": data.get("deviceName"),
+            "image": data.get("deviceImg"),
+            "is_on": None if is_close is None else not is_close,
+            "light_rate": _to_int(data.get("deviceLightRate")),
+            "group_id": data.get("groupId"),
+            "group_name": data.get("groupName"),
+        }
+
+    def replace(self, **changes):
+        """Return a copy with some raw fields changed and derived values redone."""
+        fields = {name: getattr(self, name) for name in self._init_fields}
+        return type(self)(**{**fields, **changes})
+
+    def as_dict(self):
+        """Return all fields, including derived ones, for diagnostics."""
+        return {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+        }
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        # Derived values follow from the constructor fields
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self._init_fields
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class LightState(DeviceState):
+    """State of a light; ``brightness`` is precomputed on the 0-255 scale."""
+
+    __slots__ = ("brightness",)
+
+    def __init__(self, **fields):
+        super().__init__(**fields)
+        object.__setattr__(self, "brightness", _brightness(self.light_rate))
+
+    @classmethod
+    def from_api(cls, data):
+        """Parse one entry of the LIGHT device list."""
+        return cls(**cls._common_fields(data))
+
+
+class FanState(DeviceState):
+    """State of a fan with its parsed climate readings.
+
+    ``temperature`` is in °F as reported by the cloud; the clamped
+    ``percentage`` is derived from the speed slider once.
+    """
+
+    __slots__ = ("temperature", "humidity", "speed", "percentage")
+
+    _init_fields = DeviceState._init_fields + ("temperature", "humidity", "speed")
+
+    def __init__(self, temperature, humidity, speed, **fields):
+        super().__init__(**fields)
+        light_rate = self.light_rate
+        _set = object.__setattr__
+        _set(self, "temperature", temperature)
+        _set(self, "humidity", humidity)
+        _set(self, "speed", speed)
+        _set(
+            self,
+            "percentage",
+            (
+                None
+                if light_rate is None
+                else min(max(light_rate, MIN_FAN_PERCENTAGE), 100)
+            ),
+        )
+
+    @classmethod
+    def from_api(cls, data):
+        """Parse one entry of the WIND device list."""
+        fields = cls._common_fields(data)
+        if "deviceLightRate" not in data:
+            # Fans without a reported slider value start at the lowest speed
+            fields["light_rate"] = MIN_FAN_PERCENTAGE
+        return cls(
+            **fields,
+            temperature=_to_float(data.get("temperature")),
+            humidity=_to_float(data.get("humidity")),
+            speed=_to_int(data.get("speed")),
+        )
+
+
+class DeviceGroup:
+    """A group of devices sharing a ``groupId`` in the device list.
+
+    Commands sent with the group id reach every member in one request.
+    """
+
+    __slots__ = ("group_id", "name", "light_ids", "fan_ids")
+
+    def __init__(self, group_id, name, light_ids, fan_ids):
+        self.group_id = group_id
+        self.name = name
+        self.light_ids = light_ids
+        self.fan_ids = fan_ids
+
+    @property
+    def device_ids(self):
+        return self.light_ids + self.fan_ids
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    __hash__ = None
+
+    def state(self, lights, fans):
+        """Return (is_on, brightness) aggregated over the members.
+
+        The group is on if any member is on; brightness is the mean light
+        rate of the member lights on the 0-255 scale.
+        """
+        members = [lights[i] for i in self.light_ids if i in lights]
+        members += [fans[i] for i in self.fan_ids if i in fans]
+        if not members:
+            return None, None
+        is_on = any(member.is_on for member in members)
+        rates = [
+            lights[i].light_rate
+            for i in self.light_ids
+            if i in lights and lights[i].light_rate is not None
+        ]
+        brightness = _brightness(sum(rates) // len(rates)) if rates else None
+        return is_on, brightness
+
+
+def group_devices(lights, fans):
+    """Build the groups of an account from its light and fan snapshots."""
+    groups = {}
+    for product_type, devices in (("LIGHT", lights), ("WIND", fans)):
+        for state in devices.values():
+            if state.group_id is None:
+                continue
+            group = groups.setdefault(
+                state.group_id, {"name": state.group_name, "LIGHT": [], "WIND": []}
+            )
+            group["name"] = group["name"] or state.group_name
+            group[product_type].append(state.device_id)
+    return {
+        group_id: DeviceGroup(
+            group_id, group["name"], tuple(group["LIGHT"]), tuple(group["WIND"])
+        )
+        for group_id, group in groups.items()
+    }
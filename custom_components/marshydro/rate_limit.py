@@ -0,0 +1,85 @@
+"""Token-bucket rate limiting for requests to the Mars Hydro cloud."""
+
+import asyncio
+import time
+
+from .stats import DurationStats
+
+DEFAULT_POLL_RATE = 30  # Device list requests per minute
+DEFAULT_COMMAND_RATE = 60  # Switch and adjustLight requests per minute
+DEFAULT_BURST = 10  # Requests that may be sent back to back
+
+POLL = "poll"
+COMMAND = "command"
+
+
+class TokenBucket:
+    """Hand out up to ``capacity`` requests at once, refilled at ``rate`` per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()  # Waiters are served in arrival order
+
+    def configure(self, rate, capacity):
+        """Change the refill rate and capacity."""
+        self._refill()
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+
+    def _refill(self):
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait for a token and return the seconds spent waiting."""
+        start = time.monotonic()
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+        return time.monotonic() - start
+
+
+class RateLimiter:
+    """Separate request budgets for polls and commands of one account."""
+
+    def __init__(
+        self,
+        poll_rate=DEFAULT_POLL_RATE,
+        command_rate=DEFAULT_COMMAND_RATE,
+        burst=DEFAULT_BURST,
+    ):
+        self.buckets = {
+            POLL: TokenBucket(poll_rate / 60, burst),
+            COMMAND: TokenBucket(command_rate / 60, burst),
+        }
+        self.wait = {POLL: DurationStats(), COMMAND: DurationStats()}
+
+    def configure(self, poll_rate, command_rate, burst=DEFAULT_BURST):
+        """Change the per-minute budgets."""
+        self.buckets[POLL].configure(poll_rate / 60, burst)
+        self.buckets[COMMAND].configure(command_rate / 60, burst)
+
+    async def acquire(self, kind):
+        """Wait until a request of the given kind may be sent."""
+        waited = await self.buckets[kind].acquire()
+        self.wait[kind].record(waited * 1000)
+
+    def as_dict(self):
+        """Return the budgets and wait times for diagnostics."""
+        return {
+            kind: {
+                "per_minute": round(bucket.rate * 60, 1),
+                "tokens": round(bucket.tokens, 2),
+                "wait_ms": self.wait[kind].as_dict(),
+            }
+            for kind, bucket in self.buckets.items()
+        }
@@ -0,0 +1,158 @@
+"""Concurrency control for requests to the Mars Hydro cloud."""
+
+import asyncio
+from collections import deque
+import time
+
+from .rate_limit import COMMAND, POLL
+from .stats import DurationStats
+
+DEFAULT_READ_LIMIT = 4  # Device list requests sent at the same time
+MAX_READ_LIMIT = 8  # Keeps pooled connections free for commands
+
+
+class _Job:
+    """A queued request and the futures of every caller waiting for it."""
+
+    __slots__ = ("lane", "key", "func", "args", "waiters", "queued_at")
+
+    def __init__(self, lane, key, func, args):
+        self.lane = lane
+        self.key = key
+        self.func = func
+        self.args = args
+        self.waiters = []
+        self.queued_at = time.monotonic()
+
+
+class RequestScheduler:
+    """Run requests concurrently wherever the cloud handles them independently.
+
+    Commands are keyed by the device (or group) they change: commands with
+    the same key run one after another in arrival order, commands to
+    different devices run in parallel. Polls run in parallel up to
+    ``read_limit``, which stays below the connection pool size, so commands
+    never wait for polls. Concurrent fetches of the same device list are
+    already shared by the API, so polls are not keyed.
+    """
+
+    def __init__(self, read_limit=DEFAULT_READ_LIMIT):
+        self.read_limit = read_limit
+        self._commands = {}  # key -> deque of commands waiting for that device
+        self._busy_keys = set()  # Keys with a command in progress
+        self._polls = deque()
+        self._running = set()  # Tasks of the requests in progress
+        self._running_reads = 0
+        self.wait = {COMMAND: DurationStats(), POLL: DurationStats()}
+
+    def configure(self, read_limit):
+        """Change how many polls may run at the same time."""
+        self.read_limit = read_limit
+        self._start_next()
+
+    async def run(self, lane, func, *args, key=None):
+        """Queue ``func(*args)`` in a lane and return its result.
+
+        ``key`` names the device or group a command changes.
+        """
+        job = _Job(lane, key, func, args)
+        if lane == COMMAND:
+            self._commands.setdefault(key, deque()).append(job)
+        else:
+            self._polls.append(job)
+        future = asyncio.get_running_loop().create_future()
+        job.waiters.append(future)
+        self._start_next()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._forget(job, future)
+            raise
+
+    def _forget(self, job, future):
+        """Drop a cancelled caller and its job if nobody else waits for it."""
+        if future in job.waiters:
+            job.waiters.remove(future)
+        if job.waiters:
+            return
+        if job.lane == COMMAND:
+            queue = self._commands.get(job.key)
+            if queue and job in queue:
+                queue.remove(job)
+                if not queue:
+                    del self._commands[job.key]
+        elif job in self._polls:
+            self._polls.remove(job)
+
+    def _start_next(self):
+        """Start every queued job whose device and lane have room."""
+        for key in [key for key in self._commands if key not in self._busy_keys]:
+            queue = self._commands[key]
+            job = queue.popleft()
+            if not queue:
+                del self._commands[key]
+            self._busy_keys.add(key)
+            self._start(job)
+        while self._polls and self._running_reads < self.read_limit:
+            job = self._polls.popleft()
+            self._running_reads += 1
+            self._start(job)
+
+    def _start(self, job):
+        self.wait[job.lane].record((time.monotonic() - job.queued_at) * 1000)
+        task = asyncio.ensure_future(self._execute(job))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job):
+        """Run a job and hand its outcome to every waiting caller."""
+        try:
+            result = await job.func(*job.args)
+        except asyncio.CancelledError:
+            for future in job.waiters:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in job.waiters:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in job.waiters:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            if job.lane == COMMAND:
+                self._busy_keys.discard(job.key)
+            else:
+                self._running_reads -= 1
+            self._start_next()
+
+    async def close(self):
+        """Cancel the running requests and every queued caller."""
+        queued = [job for queue in self._commands.values() for job in queue]
+        queued += self._polls
+        for job in queued:
+            for future in job.waiters:
+                future.cancel()
+        self._commands.clear()
+        self._polls.clear()
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    def as_dict(self):
+        """Return queue lengths and wait times for diagnostics."""
+        return {
+            "running": len(self._running),
+            "running_reads": self._running_reads,
+            "read_limit": self.read_limit,
+            COMMAND: {
+                "queued": sum(len(queue) for queue in self._commands.values()),
+                "wait_ms": self.wait[COMMAND].as_dict(),
+            },
+            POLL: {
+                "queued": len(self._polls),
+                "wait_ms": self.wait[POLL].as_dict(),
+            },
+        }
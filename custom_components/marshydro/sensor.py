@@ -1,42 +1,125 @@
-from homeassistant.components.sensor import SensorEntity
-from . import _LOGGER, DOMAIN
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTemperature, UnitOfTime
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from . import _LOGGER, DOMAIN, _account_key
+from .entity import MarsHydroDeviceEntity
+from .api import API_ENDPOINTS
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the Mars Hydro sensors."""
     api = hass.data[DOMAIN][entry.entry_id].get("api")
+    coordinator = hass.data[DOMAIN][entry.entry_id].get("coordinator")
 
     if api:
-        # Create all sensors
-        brightness_sensor = MarsHydroBrightnessSensor(api, entry.entry_id)
-        fan_temperature_sensor = MarsHydroFanTemperatureSensor(api, entry.entry_id)
-        fan_temperature_celsius_sensor = MarsHydroFanTemperatureCelsiusSensor(
-            api, entry.entry_id
+        # Create all sensors, one set per device
+        sensors = [
+            MarsHydroBrightnessSensor(coordinator, api, entry.entry_id, device_id)
+            for device_id in coordinator.data["LIGHT"]
+        ]
+        for device_id in coordinator.data["WIND"]:
+            sensors += [
+                MarsHydroFanTemperatureSensor(
+                    coordinator, api, entry.entry_id, device_id
+                ),
+                MarsHydroFanHumiditySensor(coordinator, api, entry.entry_id, device_id),
+                MarsHydroFanSpeedSensor(coordinator, api, entry.entry_id, device_id),
+            ]
+        _migrate_temperature_sensors(hass, entry, coordinator.data["WIND"])
+        # Diagnostic request statistics, disabled by default. Entries of the
+        # same account share one API, so only one of them reports them.
+        if _stats_entry_id(hass, entry) != entry.entry_id:
+            _remove_stats_sensors(hass, entry)
+        else:
+            sensors += _stats_sensors(coordinator, api, entry)
+        async_add_entities(sensors)
+
+
+def _stats_sensors(coordinator, api, entry):
+    """Create the request statistics sensors of every API endpoint."""
+    sensors = []
+    for endpoint, key in API_ENDPOINTS.items():
+        sensors += [
+            MarsHydroApiCallsSensor(coordinator, api, entry.entry_id, endpoint, key),
+            MarsHydroApiLatencySensor(coordinator, api, entry.entry_id, endpoint, key),
+        ]
+    return sensors
+
+
+def _stats_entry_id(hass, entry):
+    """Return the entry that reports the statistics of the entry's account.
+
+    This is the first enabled entry of the account, independent of the order
+    in which the entries are loaded.
+    """
+    account = _account_key(entry)
+    for other in hass.config_entries.async_entries(DOMAIN):
+        if other.disabled_by is None and _account_key(other) == account:
+            return other.entry_id
+    return entry.entry_id
+
+
+def _remove_stats_sensors(hass, entry):
+    """Drop statistics sensors an entry created before it shared its API."""
+    registry = er.async_get(hass)
+    for key in API_ENDPOINTS.values():
+        for kind in ("calls", "latency"):
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{entry.entry_id}_api_{key}_{kind}"
+            )
+            if entity_id:
+                _LOGGER.info(f"Removing {entity_id}, another entry reports it")
+                registry.async_remove(entity_id)
+
+
+def _migrate_temperature_sensors(hass, entry, fan_ids):
+    """Drop the former °C duplicates; the temperature sensor converts units.
+
+    Existing temperature sensors keep displaying °F so their recorded history
+    stays in one unit; the display unit can be changed in the entity settings.
+    """
+    registry = er.async_get(hass)
+    for device_id in fan_ids:
+        celsius_entity_id = registry.async_get_entity_id(
+            "sensor",
+            DOMAIN,
+            f"{entry.entry_id}_fan_temperature_celsius_sensor_{device_id}",
+        )
+        if not celsius_entity_id:
+            continue
+        _LOGGER.info(
+            f"Removing {celsius_entity_id}, use the temperature sensor instead"
         )
-        fan_humidity_sensor = MarsHydroFanHumiditySensor(api, entry.entry_id)
-        fan_speed_sensor = MarsHydroFanSpeedSensor(api, entry.entry_id)
-        async_add_entities(
-            [
-                brightness_sensor,
-                fan_temperature_sensor,
-                fan_temperature_celsius_sensor,
-                fan_humidity_sensor,
-                fan_speed_sensor,
-            ],
-            update_before_add=True,
+        registry.async_remove(celsius_entity_id)
+
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{entry.entry_id}_fan_temperature_sensor_{device_id}"
         )
+        if entity_id and not registry.async_get(entity_id).options.get("sensor"):
+            registry.async_update_entity_options(
+                entity_id,
+                "sensor",
+                {"unit_of_measurement": UnitOfTemperature.FAHRENHEIT},
+            )
 
 
-class MarsHydroBrightnessSensor(SensorEntity):
+class MarsHydroBrightnessSensor(MarsHydroDeviceEntity, SensorEntity):
     """Representation of the Mars Hydro brightness sensor."""
 
-    def __init__(self, api, entry_id):
+    def __init__(self, coordinator, api, entry_id, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None
+        self._device_id = device_id
         self._device_name = None
         self._brightness = None
         self._available = True
         self._entry_id = entry_id
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -55,7 +138,7 @@ class MarsHydroBrightnessSensor(SensorEntity):
     @property
     def available(self):
         """Return True if the sensor is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def native_unit_of_measurement(self):
@@ -84,14 +167,13 @@ class MarsHydroBrightnessSensor(SensorEntity):
             "model": "Mars Hydro Light",
         }
 
-    async def async_update(self):
+    def _update_from_coordinator(self):
         """Update the sensor state."""
         try:
-            light_data = await self._api.safe_api_call(self._api.get_lightdata)
+            light_data = self.coordinator.data["LIGHT"].get(self._device_id)
             if light_data:
-                self._device_id = light_data["id"]
-                self._device_name = light_data["deviceName"]
-                self._brightness = light_data["deviceLightRate"]
+                self._device_name = light_data.name
+                self._brightness = light_data.light_rate
                 self._available = True
                 _LOGGER.info(
                     f"Brightness sensor updated: {self._brightness}% for {self._device_name}"
@@ -104,16 +186,22 @@ class MarsHydroBrightnessSensor(SensorEntity):
             _LOGGER.error(f"Error updating brightness sensor: {e}")
 
 
-class MarsHydroFanTemperatureSensor(SensorEntity):
-    """Representation of the Mars Hydro fan temperature sensor."""
+class MarsHydroFanTemperatureSensor(MarsHydroDeviceEntity, SensorEntity):
+    """Representation of the Mars Hydro fan temperature sensor.
 
-    def __init__(self, api, entry_id):
+    The cloud reports °F; Home Assistant converts to the unit chosen for
+    display, so there is no separate Celsius sensor.
+    """
+
+    def __init__(self, coordinator, api, entry_id, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None
+        self._device_id = device_id
         self._device_name = None
         self._temperature = None
         self._available = True
         self._entry_id = entry_id
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -132,12 +220,22 @@ class MarsHydroFanTemperatureSensor(SensorEntity):
     @property
     def available(self):
         """Return True if the sensor is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def native_unit_of_measurement(self):
         """Return the unit of measurement."""
-        return "°F"
+        return UnitOfTemperature.FAHRENHEIT
+
+    @property
+    def device_class(self):
+        """Return the device class."""
+        return SensorDeviceClass.TEMPERATURE
+
+    @property
+    def state_class(self):
+        """Return the state class for long-term statistics."""
+        return SensorStateClass.MEASUREMENT
 
     @property
     def unique_id(self):
@@ -161,24 +259,22 @@ class MarsHydroFanTemperatureSensor(SensorEntity):
             "model": "Mars Hydro Fan",
         }
 
-    async def async_update(self):
+    def _update_from_coordinator(self):
         """Update the fan temperature sensor state."""
         try:
-            fan_data = await self._api.safe_api_call(self._api.get_fandata)
+            fan_data = self.coordinator.data["WIND"].get(self._device_id)
             if fan_data:
-                self._device_id = fan_data["id"]
-                self._device_name = fan_data["deviceName"]
-                raw_temperature = fan_data["temperature"]
-
-                try:
-                    self._temperature = float(raw_temperature)
+                self._device_name = fan_data.name
+                self._temperature = fan_data.temperature
+                if self._temperature is not None:
                     self._available = True
                     _LOGGER.info(
                         f"Fan temperature updated: {self._temperature}°F for {self._device_name}"
                     )
-                except ValueError:
-                    _LOGGER.warning("Invalid temperature data: %s", raw_temperature)
-                    self._temperature = None
+                else:
+                    _LOGGER.warning(
+                        "Invalid temperature data for %s", self._device_name
+                    )
                     self._available = False
             else:
                 self._available = False
@@ -189,105 +285,18 @@ class MarsHydroFanTemperatureSensor(SensorEntity):
             _LOGGER.error(f"Error updating fan temperature sensor: {e}")
 
 
-class MarsHydroFanTemperatureCelsiusSensor(SensorEntity):
-    """Representation of the Mars Hydro fan temperature sensor in Celsius."""
-
-    def __init__(self, api, entry_id):
-        self._api = api
-        self._device_id = None
-        self._device_name = None
-        self._temperature_celsius = None
-        self._available = True
-        self._entry_id = entry_id
-
-    @property
-    def name(self):
-        """Return the name of the fan temperature sensor (Celsius)."""
-        if self._device_name and self._device_id:
-            return (
-                f"{self._device_name} Temperature Sensor (Celsius) ({self._device_id})"
-            )
-        elif self._device_name:
-            return f"{self._device_name} Temperature Sensor (Celsius)"
-        return "Mars Hydro Fan Temperature Sensor (Celsius)"
-
-    @property
-    def native_value(self):
-        """Return the fan's temperature in Celsius."""
-        return self._temperature_celsius
-
-    @property
-    def available(self):
-        """Return True if the sensor is available."""
-        return self._available
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return "°C"
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for the fan temperature sensor in Celsius."""
-        return (
-            f"{self._entry_id}_fan_temperature_celsius_sensor_{self._device_id}"
-            if self._device_id
-            else f"{self._entry_id}_fan_temperature_celsius_sensor"
-        )
-
-    @property
-    def device_info(self):
-        """Return device information for linking with the fan device registry."""
-        if not self._device_id or not self._device_name:
-            return None
-
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_name,
-            "manufacturer": "Mars Hydro",
-            "model": "Mars Hydro Fan",
-        }
-
-    async def async_update(self):
-        """Update the fan temperature in Celsius."""
-        try:
-            fan_data = await self._api.safe_api_call(self._api.get_fandata)
-            if fan_data:
-                self._device_id = fan_data["id"]
-                self._device_name = fan_data["deviceName"]
-                raw_temperature = fan_data["temperature"]
-
-                try:
-                    self._temperature_celsius = round(
-                        (float(raw_temperature) - 32) * 5 / 9, 1
-                    )
-                    self._available = True
-                    _LOGGER.info(
-                        f"Fan temperature updated: {self._temperature_celsius}°C for {self._device_name}"
-                    )
-                except ValueError:
-                    _LOGGER.warning("Invalid temperature data: %s", raw_temperature)
-                    self._temperature_celsius = None
-                    self._available = False
-            else:
-                self._available = False
-                self._temperature_celsius = None
-                _LOGGER.warning("Could not update fan temperature (Celsius) sensor.")
-        except Exception as e:
-            self._available = False
-            _LOGGER.error(f"Error updating fan temperature (Celsius) sensor: {e}")
-
-
-class MarsHydroFanHumiditySensor(SensorEntity):
+class MarsHydroFanHumiditySensor(MarsHydroDeviceEntity, SensorEntity):
     """Representation of the Mars Hydro fan humidity sensor."""
 
-    def __init__(self, api, entry_id):
+    def __init__(self, coordinator, api, entry_id, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None
+        self._device_id = device_id
         self._device_name = None
         self._humidity = None
         self._available = True
         self._entry_id = entry_id
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -306,7 +315,7 @@ class MarsHydroFanHumiditySensor(SensorEntity):
     @property
     def available(self):
         """Return True if the sensor is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def native_unit_of_measurement(self):
@@ -335,24 +344,20 @@ class MarsHydroFanHumiditySensor(SensorEntity):
             "model": "Mars Hydro Fan",
         }
 
-    async def async_update(self):
+    def _update_from_coordinator(self):
         """Update the fan humidity sensor state."""
         try:
-            fan_data = await self._api.safe_api_call(self._api.get_fandata)
+            fan_data = self.coordinator.data["WIND"].get(self._device_id)
             if fan_data:
-                self._device_id = fan_data["id"]
-                self._device_name = fan_data["deviceName"]
-                raw_humidity = fan_data["humidity"]
-
-                try:
-                    self._humidity = float(raw_humidity)
+                self._device_name = fan_data.name
+                self._humidity = fan_data.humidity
+                if self._humidity is not None:
                     self._available = True
                     _LOGGER.info(
                         f"Fan humidity updated: {self._humidity}% for {self._device_name}"
                     )
-                except ValueError:
-                    _LOGGER.warning("Invalid humidity data: %s", raw_humidity)
-                    self._humidity = None
+                else:
+                    _LOGGER.warning("Invalid humidity data for %s", self._device_name)
                     self._available = False
             else:
                 self._available = False
@@ -363,16 +368,18 @@ class MarsHydroFanHumiditySensor(SensorEntity):
             _LOGGER.error(f"Error updating fan humidity sensor: {e}")
 
 
-class MarsHydroFanSpeedSensor(SensorEntity):
+class MarsHydroFanSpeedSensor(MarsHydroDeviceEntity, SensorEntity):
     """Representation of the Mars Hydro fan speed sensor."""
 
-    def __init__(self, api, entry_id):
+    def __init__(self, coordinator, api, entry_id, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None
+        self._device_id = device_id
         self._device_name = None
         self._speed = None
         self._available = True
         self._entry_id = entry_id
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -391,7 +398,7 @@ class MarsHydroFanSpeedSensor(SensorEntity):
     @property
     def available(self):
         """Return True if the sensor is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def native_unit_of_measurement(self):
@@ -420,24 +427,20 @@ class MarsHydroFanSpeedSensor(SensorEntity):
             "model": "Mars Hydro Fan",
         }
 
-    async def async_update(self):
+    def _update_from_coordinator(self):
         """Update the fan speed sensor state."""
         try:
-            fan_data = await self._api.safe_api_call(self._api.get_fandata)
+            fan_data = self.coordinator.data["WIND"].get(self._device_id)
             if fan_data:
-                self._device_id = fan_data["id"]
-                self._device_name = fan_data["deviceName"]
-                raw_speed = fan_data.get("speed")
-
-                try:
-                    self._speed = int(raw_speed)
+                self._device_name = fan_data.name
+                self._speed = fan_data.speed
+                if self._speed is not None:
                     self._available = True
                     _LOGGER.info(
                         f"Fan speed updated: {self._speed} RPM for {self._device_name}"
                     )
-                except ValueError:
-                    _LOGGER.warning("Invalid speed data: %s", raw_speed)
-                    self._speed = None
+                else:
+                    _LOGGER.warning("Invalid speed data for %s", self._device_name)
                     self._available = False
             else:
                 self._available = False
@@ -446,3 +449,92 @@ class MarsHydroFanSpeedSensor(SensorEntity):
         except Exception as e:
             self._available = False
             _LOGGER.error(f"Error updating fan speed sensor: {e}")
+
+
+class MarsHydroApiStatsSensor(CoordinatorEntity, SensorEntity):
+    """Base class for the diagnostic request statistics of one API endpoint."""
+
+    def __init__(self, coordinator, api, entry_id, endpoint, key):
+        super().__init__(coordinator)
+        self._api = api
+        self._entry_id = entry_id
+        self._endpoint = endpoint
+        self._key = key
+
+    @property
+    def entity_category(self):
+        """Return the entity category."""
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def entity_registry_enabled_default(self):
+        """Return False, statistics are only enabled on demand."""
+        return False
+
+    @property
+    def _stats(self):
+        """Return the statistics of the endpoint."""
+        return self._api.stats.endpoint(self._endpoint)
+
+
+class MarsHydroApiCallsSensor(MarsHydroApiStatsSensor):
+    """Number of requests sent to one API endpoint."""
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"Mars Hydro API {self._key.replace('_', ' ').title()} Calls"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return f"{self._entry_id}_api_{self._key}_calls"
+
+    @property
+    def state_class(self):
+        """Return the state class."""
+        return SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self):
+        """Return the number of requests sent."""
+        return self._stats.calls
+
+    @property
+    def extra_state_attributes(self):
+        """Return the error and retry counters."""
+        return {"errors": self._stats.errors, "retries": self._stats.retries}
+
+
+class MarsHydroApiLatencySensor(MarsHydroApiStatsSensor):
+    """p95 latency of one API endpoint, with p50 and p99 as attributes."""
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"Mars Hydro API {self._key.replace('_', ' ').title()} Latency"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return f"{self._entry_id}_api_{self._key}_latency"
+
+    @property
+    def state_class(self):
+        """Return the state class."""
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def native_unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return UnitOfTime.MILLISECONDS
+
+    @property
+    def native_value(self):
+        """Return the p95 latency over recent requests."""
+        return self._stats.percentiles()["p95"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return all latency percentiles."""
+        return self._stats.percentiles()
@@ -0,0 +1,135 @@
+"""Services of the Mars Hydro integration."""
+
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.helpers import config_validation as cv
+
+from .const import DEFAULT_APPLY_CONCURRENCY, DOMAIN, MAX_APPLY_CONCURRENCY
+from .models import MIN_FAN_PERCENTAGE, FanState
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY_STATE = "apply_state"
+
+ATTR_DEVICES = "devices"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
+ATTR_IS_ON = "is_on"
+ATTR_BRIGHTNESS_PCT = "brightness_pct"
+ATTR_PERCENTAGE = "percentage"
+
+# Results reported per device
+APPLIED = "applied"
+SKIPPED = "skipped"
+FAILED = "failed"
+NOT_FOUND = "not_found"
+
+TARGET_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_IS_ON): cv.boolean,
+        vol.Optional(ATTR_BRIGHTNESS_PCT): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(ATTR_PERCENTAGE): vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_FAN_PERCENTAGE, max=100)
+        ),
+    }
+)
+
+APPLY_STATE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICES): vol.Schema({cv.string: TARGET_SCHEMA}),
+        vol.Optional(ATTR_MAX_CONCURRENCY, default=DEFAULT_APPLY_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_APPLY_CONCURRENCY)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def apply_state(call: ServiceCall):
+        return await async_apply_state(
+            hass, call.data[ATTR_DEVICES], call.data[ATTR_MAX_CONCURRENCY]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_STATE,
+        apply_state,
+        schema=APPLY_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def async_apply_state(hass: HomeAssistant, targets, max_concurrency):
+    """Bring many devices to their targets with bounded concurrency.
+
+    Devices are handled concurrently, at most ``max_concurrency`` at a time;
+    the commands of one device run in order. Only values that differ from
+    the last known state are sent. Returns the result of every device.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def apply(device_id, target):
+        async with semaphore:
+            return await _async_apply_device(hass, device_id, target)
+
+    results = await asyncio.gather(
+        *(apply(device_id, target) for device_id, target in targets.items())
+    )
+    return {"results": dict(zip(targets, results))}
+
+
+def _find_device(hass: HomeAssistant, device_id):
+    """Return the API client and state of a device on any loaded account."""
+    for client in hass.data.get(DOMAIN, {}).get("clients", {}).values():
+        state = client["api"].get_device(device_id)
+        if state is not None:
+            return client["api"], state
+    return None, None
+
+
+async def _async_apply_device(hass: HomeAssistant, device_id, target):
+    """Send the commands one device needs to reach its target."""
+    api, state = _find_device(hass, device_id)
+    if api is None:
+        return {"result": NOT_FOUND}
+
+    is_fan = isinstance(state, FanState)
+    level = target.get(ATTR_PERCENTAGE if is_fan else ATTR_BRIGHTNESS_PCT)
+    commands = []
+    if level is not None and level != state.light_rate:
+        # Targets are final values, so they skip the slider debounce
+        commands.append(("adjust", api.adjust_light_now, (level, device_id)))
+    is_on = target.get(ATTR_IS_ON)
+    if is_on is not None and is_on != state.is_on:
+        switch = (
+            "switch",
+            api.safe_api_call,
+            (api.toggle_switch, not is_on, device_id),
+        )
+        # Power on before dimming up, dim before powering off
+        if is_on:
+            commands.insert(0, switch)
+        else:
+            commands.append(switch)
+    if not commands:
+        return {"result": SKIPPED}
+
+    sent = []
+    for name, command, args in commands:
+        try:
+            response = await command(*args)
+        except Exception as e:
+            _LOGGER.error(f"Error applying state to {device_id}: {e}")
+            return {"result": FAILED, "sent": sent, "error": str(e)}
+        if response.get("code") != "000":
+            _LOGGER.error(f"Error applying state to {device_id}: {response.get('msg')}")
+            return {"result": FAILED, "sent": sent, "error": response.get("msg")}
+        sent.append(name)
+    return {"result": APPLIED, "sent": sent}
@@ -0,0 +1,104 @@
+"""Request statistics collected by the Mars Hydro API client."""
+
+from collections import deque
+import math
+import time
+
+LATENCY_SAMPLES = 500  # Latencies kept per endpoint for the percentiles
+TRACE_SIZE = 50  # Most recent requests kept for diagnostics
+
+
+class DurationStats:
+    """Count, maximum and recent samples of a duration in milliseconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.max = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, duration_ms):
+        """Record one duration."""
+        self.count += 1
+        self.max = max(self.max, duration_ms)
+        self.samples.append(duration_ms)
+
+    def percentiles(self):
+        """Return the p50/p95/p99 in milliseconds over recent samples."""
+        if not self.samples:
+            return {"p50": None, "p95": None, "p99": None}
+        ordered = sorted(self.samples)
+        return {
+            f"p{pct}": round(
+                ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)], 1
+            )
+            for pct in (50, 95, 99)
+        }
+
+    def as_dict(self):
+        """Return the count, maximum and percentiles as a plain dict."""
+        return {"count": self.count, "max": round(self.max, 1), **self.percentiles()}
+
+
+class EndpointStats(DurationStats):
+    """Call, error and retry counters plus recent latencies of one endpoint."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = 0
+        self.retries = 0
+
+    @property
+    def calls(self):
+        """Return the number of requests sent."""
+        return self.count
+
+    def record(self, duration_ms, error=False):
+        """Record one finished request."""
+        super().record(duration_ms)
+        if error:
+            self.errors += 1
+
+    def as_dict(self):
+        """Return the counters and percentiles as a plain dict."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            **self.percentiles(),
+        }
+
+
+class ApiStats:
+    """Per-endpoint request statistics and recent requests."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.traces = deque(maxlen=TRACE_SIZE)
+
+    def endpoint(self, endpoint):
+        """Return the statistics of an endpoint, creating them on first use."""
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_request(self, endpoint, duration_ms, status):
+        """Record a finished request in its endpoint stats and the trace."""
+        self.endpoint(endpoint).record(duration_ms, error=status != "000")
+        self.traces.append(
+            {
+                "endpoint": endpoint,
+                "finished": time.time(),
+                "duration_ms": round(duration_ms, 1),
+                "status": status,
+            }
+        )
+
+    def as_dict(self):
+        """Return all statistics as a plain dict."""
+        return {
+            "endpoints": {
+                endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()
+            },
+            "recent_requests": list(self.traces),
+        }
@@ -1,28 +1,40 @@
 from homeassistant.components.switch import SwitchEntity
 from . import _LOGGER, DOMAIN
+from .entity import MarsHydroDeviceEntity
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the switch platform."""
     api = hass.data[DOMAIN][entry.entry_id].get("api")
+    coordinator = hass.data[DOMAIN][entry.entry_id].get("coordinator")
 
     if api:
-        light_switch = MarsHydroSwitch(api, entry.entry_id, device_type="LIGHT")
-        fan_switch = MarsHydroSwitch(api, entry.entry_id, device_type="WIND")
-        async_add_entities([light_switch, fan_switch], update_before_add=True)
-
-
-class MarsHydroSwitch(SwitchEntity):
+        switches = [
+            MarsHydroSwitch(coordinator, api, entry.entry_id, device_type, device_id)
+            for device_type in ("LIGHT", "WIND")
+            for device_id in coordinator.data[device_type]
+        ]
+        # One switch per group, switched with a single request
+        switches += [
+            MarsHydroGroupSwitch(coordinator, api, entry.entry_id, group_id)
+            for group_id in coordinator.data["GROUP"]
+        ]
+        async_add_entities(switches)
+
+
+class MarsHydroSwitch(MarsHydroDeviceEntity, SwitchEntity):
     """Representation of a Mars Hydro switch."""
 
-    def __init__(self, api, entry_id, device_type):
+    def __init__(self, coordinator, api, entry_id, device_type, device_id):
+        super().__init__(coordinator)
         self._api = api
-        self._device_id = None  # To store the dynamic device_id
+        self._device_id = device_id
         self._device_name = None  # To store the dynamic deviceName
         self._state = None
         self._available = True
         self._entry_id = entry_id
         self._device_type = device_type  # LIGHT or WIND
+        self._update_from_coordinator()
 
     @property
     def name(self):
@@ -41,7 +53,7 @@ class MarsHydroSwitch(SwitchEntity):
     @property
     def available(self):
         """Return True if the switch is available."""
-        return self._available
+        return super().available and self._available
 
     @property
     def unique_id(self):
@@ -85,6 +97,7 @@ class MarsHydroSwitch(SwitchEntity):
         except Exception as e:
             _LOGGER.error(f"Error in async_turn_on: {e}")
             self._available = False
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the device off."""
@@ -104,22 +117,16 @@ class MarsHydroSwitch(SwitchEntity):
         except Exception as e:
             _LOGGER.error(f"Error in async_turn_off: {e}")
             self._available = False
+        self.async_write_ha_state()
 
-    async def async_update(self):
-        """Update the state of the switch."""
+    def _update_from_coordinator(self):
+        """Update the state of the switch from the shared coordinator snapshot."""
         try:
-            # Choose the correct API endpoint based on device type
-            device_data = await self._api.safe_api_call(
-                self._api.get_lightdata
-                if self._device_type == "LIGHT"
-                else self._api.get_fandata
-            )
+            # LIGHT and WIND snapshots are keyed by device type
+            device_data = self.coordinator.data[self._device_type].get(self._device_id)
             if device_data:
-                self._device_id = device_data["id"]  # Set device_id dynamically
-                self._device_name = device_data[
-                    "deviceName"
-                ]  # Set deviceName dynamically
-                self._state = not device_data["isClose"]
+                self._device_name = device_data.name  # Set deviceName dynamically
+                self._state = device_data.is_on
                 self._available = True
                 _LOGGER.info(
                     f"Switch state updated: {'ON' if self._state else 'OFF'} for {self._device_name}"
@@ -132,3 +139,78 @@ class MarsHydroSwitch(SwitchEntity):
         except Exception as e:
             _LOGGER.error(f"Error updating switch state for {self._device_type}: {e}")
             self._available = False
+
+
+class MarsHydroGroupSwitch(MarsHydroSwitch):
+    """All devices of a Mars Hydro group, switched with one groupId command."""
+
+    def __init__(self, coordinator, api, entry_id, group_id):
+        self._group_id = group_id
+        self._member_ids = ()
+        super().__init__(coordinator, api, entry_id, "GROUP", None)
+
+    @property
+    def name(self):
+        """Return the name of the group switch."""
+        return f"{self._device_name or 'Mars Hydro'} Group Switch ({self._group_id})"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the group switch."""
+        return f"{self._entry_id}_group_switch_{self._group_id}"
+
+    @property
+    def device_info(self):
+        """Return device information for the group."""
+        return {
+            "identifiers": {(DOMAIN, f"group_{self._group_id}")},
+            "name": self._device_name or f"Mars Hydro Group {self._group_id}",
+            "manufacturer": "Mars Hydro",
+            "model": "Mars Hydro Group",
+        }
+
+    async def async_turn_on(self, **kwargs):
+        """Turn every device of the group on."""
+        await self._async_toggle(False)
+
+    async def async_turn_off(self, **kwargs):
+        """Turn every device of the group off."""
+        await self._async_toggle(True)
+
+    async def _async_toggle(self, is_close):
+        try:
+            response = await self._api.safe_api_call(
+                self._api.toggle_group, is_close, self._group_id
+            )
+            if response.get("code") == "000":
+                self._state = not is_close
+                _LOGGER.info(
+                    f"Group '{self._device_name}' turned {'off' if is_close else 'on'}."
+                )
+            else:
+                _LOGGER.error(f"Error switching group: {response.get('msg')}")
+        except Exception as e:
+            _LOGGER.error(f"Error switching group {self._group_id}: {e}")
+            self._available = False
+        self.async_write_ha_state()
+
+    def _is_changed(self, changed_ids):
+        """Return True if any member device changed or the members did."""
+        group = self.coordinator.data["GROUP"].get(self._group_id)
+        device_ids = group.device_ids if group else ()
+        return device_ids != self._member_ids or not changed_ids.isdisjoint(device_ids)
+
+    def _update_from_coordinator(self):
+        """Aggregate the member devices from the shared coordinator snapshot."""
+        group = self.coordinator.data["GROUP"].get(self._group_id)
+        if group is None:
+            self._member_ids = ()
+            self._available = False
+            _LOGGER.warning(f"Group {self._group_id} has no devices anymore")
+            return
+        self._member_ids = group.device_ids
+        self._device_name = group.name
+        self._state, _ = group.state(
+            self.coordinator.data["LIGHT"], self.coordinator.data["WIND"]
+        )
+        self._available = True
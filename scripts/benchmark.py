@@ -0,0 +1,277 @@
+"""Offline benchmark of the cloud request path.
+
+Runs ``MarsHydroAPI`` against the local ``FakeCloud`` and reports
+
+* startup: login plus the first discovery of all lights and fans, the
+  network work ``async_setup_entry`` does before entities are created,
+* HTTP calls and wall time per poll cycle,
+* command-to-ack latency: from calling a command until its write-through
+  reaches the shared device state, also while ``--poll-load`` device list
+  page requests are queued at the same time,
+* command throughput: switch commands per second when every device is
+  switched at once,
+* CPU time per request (client and in-process fake server), and the
+  client's own per-request encoding work: systemData header, request body
+  and response decoding.
+
+Usage::
+
+    python scripts/benchmark.py --lights 10 --fans 10 --latency 0.05
+    python scripts/benchmark.py --json > before.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fake_cloud import FakeCloud, load_module
+
+api_module = load_module("api")
+rate_limit = load_module("rate_limit")
+
+UNLIMITED = 10**9  # Requests per minute; the benchmark measures the client only
+
+
+def summarize(samples):
+    """Return min/median/p95/max in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 2),
+        "median": round(statistics.median(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def make_api(cloud, base_url):
+    limiter = rate_limit.RateLimiter(UNLIMITED, UNLIMITED, UNLIMITED)
+    return api_module.MarsHydroAPI(
+        cloud.email, cloud.password, rate_limiter=limiter, base_url=base_url
+    )
+
+
+async def measure_startup(cloud, base_url, runs):
+    samples = []
+    calls = []
+    for _ in range(runs):
+        cloud.reset_calls()
+        api = make_api(cloud, base_url)
+        start = time.perf_counter()
+        await api.login()
+        await asyncio.gather(api.get_lights(), api.get_fans())
+        samples.append((time.perf_counter() - start) * 1000)
+        calls.append(cloud.total_calls)
+        await api.close()
+    return {"ms": summarize(samples), "http_calls": max(calls)}
+
+
+async def measure_polling(api, cloud, cycles):
+    # Real polls are seconds apart, so the short response cache never hits
+    api.cache_ttl = 0
+    samples = []
+    cloud.reset_calls()
+    for _ in range(cycles):
+        start = time.perf_counter()
+        await asyncio.gather(api.get_lights(), api.get_fans())
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "ms": summarize(samples),
+        "http_calls_per_cycle": round(cloud.total_calls / cycles, 2),
+    }
+
+
+async def measure_commands(api, cloud, rounds):
+    loop = asyncio.get_running_loop()
+    waiting = {}
+
+    def on_write_through(product_type, devices):
+        for future in waiting.values():
+            if not future.done():
+                future.set_result(time.perf_counter())
+        waiting.clear()
+
+    remove_listener = api.add_state_listener(on_write_through)
+    light_ids = [device["id"] for device in cloud.devices["LIGHT"]]
+    fan_ids = [device["id"] for device in cloud.devices["WIND"]]
+
+    async def timed(device_id, command):
+        acked = waiting[device_id] = loop.create_future()
+        start = time.perf_counter()
+        await command
+        return (await acked - start) * 1000
+
+    results = {"switch": [], "brightness": [], "fan_speed": []}
+    for index in range(rounds):
+        for device_id in light_ids:
+            results["switch"].append(
+                await timed(
+                    device_id,
+                    api.safe_api_call(api.toggle_switch, index % 2 == 0, device_id),
+                )
+            )
+            results["brightness"].append(
+                await timed(device_id, api.set_brightness(25 + index % 75, device_id))
+            )
+        for device_id in fan_ids:
+            results["fan_speed"].append(
+                await timed(device_id, api.set_fanspeed(25 + index % 75, device_id))
+            )
+    remove_listener()
+    return {name: summarize(samples) for name, samples in results.items() if samples}
+
+
+async def measure_commands_under_load(api, cloud, rounds, poll_load):
+    """Switch latency while background polls keep the request queue full."""
+    stop = False
+
+    async def poll_forever(page):
+        while not stop:
+            await api._request_device_page("WIND", page)
+
+    pollers = [asyncio.ensure_future(poll_forever(page)) for page in range(poll_load)]
+    await asyncio.sleep(0)
+    light_ids = [device["id"] for device in cloud.devices["LIGHT"]]
+    samples = []
+    for index in range(rounds):
+        for device_id in light_ids:
+            start = time.perf_counter()
+            await api.safe_api_call(api.toggle_switch, index % 2 == 0, device_id)
+            samples.append((time.perf_counter() - start) * 1000)
+    stop = True
+    await asyncio.gather(*pollers)
+    return {"switch_under_poll_load": summarize(samples)}
+
+
+async def measure_command_throughput(api, cloud, rounds):
+    """Switch every device at once and return the commands sent per second."""
+    device_ids = [
+        device["id"] for devices in cloud.devices.values() for device in devices
+    ]
+    start = time.perf_counter()
+    for index in range(rounds):
+        await asyncio.gather(
+            *(
+                api.safe_api_call(api.toggle_switch, index % 2 == 0, device_id)
+                for device_id in device_ids
+            )
+        )
+    elapsed = time.perf_counter() - start
+    return {"commands_per_second": round(len(device_ids) * rounds / elapsed, 1)}
+
+
+async def measure_cpu(api, cloud, requests):
+    """CPU time per getDeviceList request; the fake server runs in-process."""
+    api.cache_ttl = 0
+    saved_latency, cloud.latency = cloud.latency, 0
+    cloud.reset_calls()
+    start = time.process_time()
+    for _ in range(requests):
+        await api.get_lights()
+    elapsed = time.process_time() - start
+    cloud.latency = saved_latency
+    return {"process_ms_per_request": round(elapsed * 1000 / cloud.total_calls, 3)}
+
+
+def measure_request_overhead(api, cloud, requests):
+    """Microseconds of client-side JSON work for one device list request."""
+    page = {
+        "code": "000",
+        "data": {"list": cloud.devices["WIND"][: cloud.page_size], "total": 1},
+    }
+    raw_response = json.dumps(page).encode()
+    payload = {"currentPage": 0, "type": None, "productType": "WIND"}
+    start = time.perf_counter()
+    for _ in range(requests):
+        api._generate_system_data()
+        api_module.json_dumps(payload)
+        api_module.json_loads(raw_response)
+    elapsed = time.perf_counter() - start
+    return {
+        "client_us_per_request": round(elapsed * 1e6 / requests, 2),
+        "json_backend": "orjson" if api_module.orjson else "json",
+    }
+
+
+async def run(args):
+    cloud = FakeCloud(
+        lights=args.lights,
+        fans=args.fans,
+        page_size=args.page_size,
+        latency=args.latency,
+    )
+    base_url = await cloud.start()
+    try:
+        report = {
+            "config": vars(args),
+            "startup": await measure_startup(cloud, base_url, args.runs),
+        }
+        api = make_api(cloud, base_url)
+        await api.login()
+        report["poll"] = await measure_polling(api, cloud, args.cycles)
+        report["command_ack"] = await measure_commands(api, cloud, args.runs)
+        report["command_ack"].update(
+            await measure_commands_under_load(api, cloud, args.runs, args.poll_load)
+        )
+        report["throughput"] = await measure_command_throughput(api, cloud, args.runs)
+        report["cpu"] = await measure_cpu(api, cloud, args.cycles)
+        report["cpu"].update(measure_request_overhead(api, cloud, 10000))
+        await api.close()
+    finally:
+        await cloud.close()
+    return report
+
+
+def print_report(report):
+    startup = report["startup"]
+    poll = report["poll"]
+    print(
+        f"startup          {startup['ms']['median']:>9.2f} ms median, "
+        f"{startup['ms']['p95']:.2f} ms p95, {startup['http_calls']} HTTP calls"
+    )
+    print(
+        f"poll cycle       {poll['ms']['median']:>9.2f} ms median, "
+        f"{poll['ms']['p95']:.2f} ms p95, "
+        f"{poll['http_calls_per_cycle']} HTTP calls"
+    )
+    for name, timing in report["command_ack"].items():
+        print(
+            f"{name + ' ack':<16} {timing['median']:>9.2f} ms median, "
+            f"{timing['p95']:.2f} ms p95"
+        )
+    throughput = report["throughput"]["commands_per_second"]
+    print(f"command throughput {throughput:>7.1f} switch commands/s")
+    cpu = report["cpu"]
+    print(f"client+server CPU {cpu['process_ms_per_request']:>8.3f} ms/request")
+    print(
+        f"client JSON work {cpu['client_us_per_request']:>9.2f} us/request "
+        f"({cpu['json_backend']})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lights", type=int, default=4)
+    parser.add_argument("--fans", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds added per response"
+    )
+    parser.add_argument("--cycles", type=int, default=50, help="poll cycles")
+    parser.add_argument("--runs", type=int, default=5, help="startups/command rounds")
+    parser.add_argument(
+        "--poll-load", type=int, default=8, help="concurrent background page polls"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Local stand-in for the Mars Hydro cloud.
+
+Serves the four endpoints used by ``api.py`` with the same ``code``
+semantics ("000" success, "102" expired token) and the same device list
+pagination, so the client can be exercised and measured offline::
+
+    cloud = FakeCloud(lights=3, fans=2, latency=0.05)
+    base_url = await cloud.start()
+    api = MarsHydroAPI("grow@example.com", "secret", base_url=base_url)
+
+The integration modules are loaded without Home Assistant through
+``load_module`` so only ``aiohttp`` is needed.
+"""
+
+import asyncio
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "marshydro"
+API_PREFIX = "/api/android"
+
+LOGIN_PATH = "/ulogin/mailLogin/v1"
+DEVICE_LIST_PATH = "/udm/getDeviceList/v1"
+SWITCH_PATH = "/udm/lampSwitch/v1"
+ADJUST_LIGHT_PATH = "/udm/adjustLight/v1"
+
+
+def load_module(name):
+    """Import ``marshydro.<name>`` without running the package ``__init__``."""
+    if "marshydro" not in sys.modules:
+        package = types.ModuleType("marshydro")
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules["marshydro"] = package
+    return importlib.import_module(f"marshydro.{name}")
+
+
+def make_light(index):
+    return {
+        "id": f"light-{index}",
+        "deviceName": f"Light {index}",
+        "deviceLightRate": 50,
+        "isClose": False,
+        "deviceImg": None,
+    }
+
+
+def make_fan(index):
+    return {
+        "id": f"fan-{index}",
+        "deviceName": f"Fan {index}",
+        "deviceLightRate": 40,
+        "isClose": False,
+        "humidity": "55",
+        "temperature": "77.0",
+        "speed": "1200",
+        "deviceImg": None,
+    }
+
+
+class FakeCloud:
+    """An aiohttp test server answering like the Mars Hydro cloud."""
+
+    def __init__(
+        self,
+        lights=1,
+        fans=1,
+        page_size=10,
+        latency=0.0,
+        email="grow@example.com",
+        password="secret",
+        groups=0,
+    ):
+        self.email = email
+        self.password = password
+        self.page_size = page_size
+        self.latency = latency  # Seconds added to every response
+        self.devices = {
+            "LIGHT": [make_light(index) for index in range(lights)],
+            "WIND": [make_fan(index) for index in range(fans)],
+        }
+        # Spread the devices round-robin over ``groups`` groups
+        for devices in self.devices.values():
+            for index, device in enumerate(devices[: groups and len(devices)]):
+                device["groupId"] = f"group-{index % groups}"
+                device["groupName"] = f"Group {index % groups}"
+        self.token = None
+        self.logins = 0
+        self.calls = {}  # path -> number of requests
+        self.server = None
+
+    def reset_calls(self):
+        self.calls = {}
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def expire_token(self):
+        """Reject the current token so the next request answers "102"."""
+        self.token = f"expired-{self.logins}"
+
+    def find_device(self, device_id):
+        for devices in self.devices.values():
+            for device in devices:
+                if device["id"] == device_id:
+                    return device
+        return None
+
+    def group_members(self, group_id, product_types=("LIGHT", "WIND")):
+        return [
+            device
+            for product_type in product_types
+            for device in self.devices[product_type]
+            if device.get("groupId") == group_id
+        ]
+
+    async def start(self):
+        """Start serving and return the base URL for ``MarsHydroAPI``."""
+        app = web.Application()
+        app.router.add_post(API_PREFIX + "/{endpoint:.*}", self._handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return str(self.server.make_url(API_PREFIX))
+
+    async def close(self):
+        if self.server is not None:
+            await self.server.close()
+            self.server = None
+
+    async def _handle(self, request):
+        path = request.path[len(API_PREFIX) :]
+        self.calls[path] = self.calls.get(path, 0) + 1
+        payload = await request.json()
+        system_data = json.loads(request.headers.get("systemData", "{}"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if path == LOGIN_PATH:
+            return self._login(payload)
+        if self.token is None or system_data.get("token") != self.token:
+            return web.json_response({"code": "102", "msg": "token expired"})
+        if path == DEVICE_LIST_PATH:
+            return self._device_list(payload)
+        if path == SWITCH_PATH:
+            return self._command(payload, ("LIGHT", "WIND"), isClose=payload["isClose"])
+        if path == ADJUST_LIGHT_PATH:
+            return self._command(payload, ("LIGHT",), deviceLightRate=payload["light"])
+        return web.json_response({"code": "404", "msg": f"unknown endpoint {path}"})
+
+    def _login(self, payload):
+        if (
+            payload.get("email") != self.email
+            or payload.get("password") != self.password
+        ):
+            return web.json_response({"code": "101", "msg": "wrong password"})
+        self.logins += 1
+        self.token = f"token-{self.logins}"
+        return web.json_response({"code": "000", "data": {"token": self.token}})
+
+    def _device_list(self, payload):
+        devices = self.devices.get(payload.get("productType"), [])
+        start = payload.get("currentPage", 0) * self.page_size
+        page = [dict(device) for device in devices[start : start + self.page_size]]
+        return web.json_response(
+            {"code": "000", "data": {"list": page, "total": len(devices)}}
+        )
+
+    def _command(self, payload, group_types, **fields):
+        """Apply a command to its device, or to all group members of group_types."""
+        if payload.get("deviceId") is None and payload.get("groupId") is not None:
+            targets = self.group_members(payload["groupId"], group_types)
+        else:
+            targets = [self.find_device(payload.get("deviceId"))]
+        if not targets or None in targets:
+            return web.json_response({"code": "201", "msg": "device not found"})
+        for device in targets:
+            device.update(fields)
+        return web.json_response({"code": "000"})
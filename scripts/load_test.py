@@ -0,0 +1,346 @@
+"""Load test of the integration with many devices across many config entries.
+
+Starts a Home Assistant core in-process, points the integration at one
+local ``FakeCloud`` per account and sets up ``--entries`` config entries
+(200 lights and 200 fans over 20 entries by default). It then reports
+
+* event loop lag: how late a 10 ms ticker wakes up while the entries are
+  set up and refreshed,
+* peak memory per entity: traced allocation peak while setting up the
+  entries again on a fresh core, divided by the number of entities created
+  (registries and states included); tracing runs in this separate pass so
+  it does not slow down the timed setup,
+* request queue wait: time requests waited in the account's scheduler,
+* state refresh latency: from a cloud-side change until the new value
+  shows up in the Home Assistant state machine.
+
+Any metric beyond its threshold makes the run exit with status 1::
+
+    python scripts/load_test.py --entries 20 --lights 10 --fans 10
+    python scripts/load_test.py --max-refresh-ms 500 --json
+
+Needs ``homeassistant`` installed in addition to ``aiohttp``.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from fake_cloud import PACKAGE_DIR, FakeCloud
+
+from homeassistant import bootstrap, config_entries, core, loader
+from homeassistant.helpers import entity_registry as er
+
+DOMAIN = "marshydro"
+TICK = 0.01  # Seconds between event loop lag samples
+ROUND_PAUSE = 1.5  # Seconds between refresh rounds, beyond the response cache TTL
+
+# Generous limits so the run measures the client, not the rate limiter
+OPTIONS = {"poll_rate_limit": 6000, "command_rate_limit": 6000}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples):
+    if not samples:
+        return {"median": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "median": round(statistics.median(samples), 2),
+        "p95": round(percentile(samples, 0.95), 2),
+        "max": round(max(samples), 2),
+    }
+
+
+class LoopLagMonitor:
+    """Measure how late a periodic ticker is woken up by the event loop."""
+
+    def __init__(self):
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + TICK
+            await asyncio.sleep(TICK)
+            self.samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def start_hass(config_dir):
+    """Start a bare Home Assistant core that can load custom integrations."""
+    custom_components = Path(config_dir) / "custom_components"
+    custom_components.mkdir()
+    (custom_components / DOMAIN).symlink_to(PACKAGE_DIR)
+    sys.path.insert(0, config_dir)
+
+    hass = core.HomeAssistant(config_dir)
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    await hass.async_start()
+    return hass
+
+
+def point_clients_at(base_urls):
+    """Make every client talk to the fake cloud of its own account."""
+    from custom_components.marshydro import api
+
+    original_init = api.MarsHydroAPI.__init__
+
+    def patched_init(self, email, password, *args, **kwargs):
+        kwargs["base_url"] = base_urls[email]
+        original_init(self, email, password, *args, **kwargs)
+
+    api.MarsHydroAPI.__init__ = patched_init
+
+
+async def setup_entries(hass, clouds):
+    entries = []
+    for index, cloud in enumerate(clouds):
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title=f"Grow room {index}",
+            data={"email": cloud.email, "password": cloud.password},
+            options=OPTIONS,
+            source=config_entries.SOURCE_USER,
+        )
+        entries.append(entry)
+    await asyncio.gather(*(hass.config_entries.async_add(entry) for entry in entries))
+    return entries
+
+
+async def stop_hass(hass, entries):
+    """Unload the entries, so their clients close their connections, and stop."""
+    await asyncio.gather(
+        *(hass.config_entries.async_unload(entry.entry_id) for entry in entries)
+    )
+    await hass.async_stop(force=True)
+
+
+async def measure_refresh(hass, clouds, entries, rounds):
+    """Change every light in the cloud and time until HA shows the change."""
+    registry = er.async_get(hass)
+    light_ids = {
+        registry_entry.entity_id
+        for registry_entry in registry.entities.values()
+        if registry_entry.platform == DOMAIN and registry_entry.domain == "light"
+    }
+    coordinators = [
+        hass.data[DOMAIN][entry.entry_id]["coordinator"] for entry in entries
+    ]
+    latencies = []
+    for index in range(rounds):
+        await asyncio.sleep(ROUND_PAUSE)
+        rate = 10 + (index * 17) % 90
+        previous = {
+            entity_id: hass.states.get(entity_id).attributes.get("brightness")
+            for entity_id in light_ids
+        }
+        pending = set(light_ids)
+        done = asyncio.get_running_loop().create_future()
+
+        @core.callback
+        def state_changed(event):
+            new_state = event.data["new_state"]
+            entity_id = event.data["entity_id"]
+            if (
+                entity_id in pending
+                and new_state is not None
+                and new_state.attributes.get("brightness") != previous[entity_id]
+            ):
+                pending.discard(entity_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if not pending and not done.done():
+                    done.set_result(None)
+
+        remove = hass.bus.async_listen(core.EVENT_STATE_CHANGED, state_changed)
+        for cloud in clouds:
+            for light in cloud.devices["LIGHT"]:
+                light["deviceLightRate"] = rate
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        await asyncio.wait_for(done, timeout=30)
+        remove()
+    return latencies
+
+
+def queue_waits(hass, entries):
+    samples = []
+    for entry in entries:
+        api = hass.data[DOMAIN][entry.entry_id]["api"]
+        for wait in api.scheduler.wait.values():
+            samples.extend(wait.samples)
+    return samples
+
+
+def count_entities(hass):
+    registry = er.async_get(hass)
+    return sum(
+        1
+        for registry_entry in registry.entities.values()
+        if registry_entry.platform == DOMAIN
+    )
+
+
+async def measure_memory(clouds):
+    """Trace the allocation peak of setting up every entry on a fresh core."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await start_hass(config_dir)
+        entries = []
+        try:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            entries = await setup_entries(hass, clouds)
+            await hass.async_block_till_done()
+            peak = tracemalloc.get_traced_memory()[1]
+            return (peak - baseline) / 1024 / count_entities(hass)
+        finally:
+            tracemalloc.stop()
+            await stop_hass(hass, entries)
+
+
+async def run(args):
+    clouds = [
+        FakeCloud(
+            lights=args.lights,
+            fans=args.fans,
+            page_size=args.page_size,
+            latency=args.latency,
+            email=f"room{index}@example.com",
+        )
+        for index in range(args.entries)
+    ]
+    base_urls = {cloud.email: await cloud.start() for cloud in clouds}
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await start_hass(config_dir)
+        point_clients_at(base_urls)
+        setup_monitor = LoopLagMonitor()
+        refresh_monitor = LoopLagMonitor()
+        setup_monitor.start()
+        entries = []
+        try:
+            setup_start = time.perf_counter()
+            entries = await setup_entries(hass, clouds)
+            await hass.async_block_till_done()
+            setup_ms = (time.perf_counter() - setup_start) * 1000
+            await setup_monitor.stop()
+            entity_count = count_entities(hass)
+
+            refresh_monitor.start()
+            refresh = await measure_refresh(hass, clouds, entries, args.rounds)
+            await refresh_monitor.stop()
+            waits = queue_waits(hass, entries)
+            await stop_hass(hass, entries)
+            # Separate pass, while the integration files are still linked
+            memory_per_entity = await measure_memory(clouds)
+        finally:
+            await setup_monitor.stop()
+            await refresh_monitor.stop()
+            if hass.state is not core.CoreState.stopped:
+                await stop_hass(hass, entries)
+            for cloud in clouds:
+                await cloud.close()
+
+    return {
+        "config": vars(args),
+        "entities": entity_count,
+        "setup_ms": round(setup_ms, 2),
+        "setup_loop_lag_ms": summarize(setup_monitor.samples),
+        "loop_lag_ms": summarize(refresh_monitor.samples),
+        "memory_per_entity_kb": round(memory_per_entity, 2),
+        "queue_wait_ms": summarize(waits),
+        "refresh_latency_ms": summarize(refresh),
+    }
+
+
+def check_thresholds(report, args):
+    limits = [
+        (
+            "setup_loop_lag_ms max",
+            report["setup_loop_lag_ms"]["max"],
+            args.max_setup_loop_lag_ms,
+        ),
+        ("loop_lag_ms max", report["loop_lag_ms"]["max"], args.max_loop_lag_ms),
+        (
+            "memory_per_entity_kb",
+            report["memory_per_entity_kb"],
+            args.max_memory_per_entity_kb,
+        ),
+        (
+            "queue_wait_ms p95",
+            report["queue_wait_ms"]["p95"],
+            args.max_queue_wait_ms,
+        ),
+        (
+            "refresh_latency_ms p95",
+            report["refresh_latency_ms"]["p95"],
+            args.max_refresh_ms,
+        ),
+    ]
+    return [
+        f"{name} = {value} exceeds {limit}"
+        for name, value, limit in limits
+        if value > limit
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--lights", type=int, default=10, help="lights per entry")
+    parser.add_argument("--fans", type=int, default=10, help="fans per entry")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds added per response"
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="refresh rounds")
+    parser.add_argument("--max-setup-loop-lag-ms", type=float, default=250)
+    parser.add_argument("--max-loop-lag-ms", type=float, default=100)
+    parser.add_argument("--max-memory-per-entity-kb", type=float, default=64)
+    parser.add_argument("--max-queue-wait-ms", type=float, default=250)
+    parser.add_argument("--max-refresh-ms", type=float, default=1000)
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    failures = check_thresholds(report, args)
+    report["failures"] = failures
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            if key not in ("config", "failures"):
+                print(f"{key:<22} {value}")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()